@@ -1,15 +1,32 @@
-from datetime import datetime
+import asyncio
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
 from typing import List, Optional, Dict, Any
+import csv
+import hashlib
+import heapq
 import io
+import math
 import os
+import random
+import threading
 import time
+import numpy as np
 import pandas as pd
 import networkx as nx
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.csgraph import connected_components
 from dateutil import parser as date_parser
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field, validator
+from fastapi.responses import FileResponse, ORJSONResponse, Response
+from pydantic import BaseModel, Field, field_validator
 
 from services.json_formatter import build_final_json
 from ml.predictor import (
@@ -18,7 +35,73 @@ from ml.predictor import (
     compute_final_scores,
 )
 
-app = FastAPI(title="Rift Money Muling API", version="0.1.0")
+# Worker processes that validate upload chunks in parallel (override with
+# CSV_VALIDATION_WORKERS). 0 keeps validation inline, which suits serverless
+# hosts where forking a pool per instance is not worth it.
+CSV_VALIDATION_WORKERS = int(os.getenv("CSV_VALIDATION_WORKERS", "0"))
+_validation_pool: Optional[ProcessPoolExecutor] = None
+
+# Worker processes for the graph / detection pipeline (override with
+# ANALYSIS_WORKERS). With 0 the pipeline runs in the thread pool, which keeps
+# the event loop free but shares the GIL with other requests.
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "0"))
+_analysis_pool: Optional[ProcessPoolExecutor] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the validation and analysis process pools for the lifetime of the app."""
+    global _validation_pool, _analysis_pool
+    if CSV_VALIDATION_WORKERS > 0:
+        _validation_pool = ProcessPoolExecutor(max_workers=CSV_VALIDATION_WORKERS)
+    if ANALYSIS_WORKERS > 0:
+        _analysis_pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS)
+    try:
+        yield
+    finally:
+        if _validation_pool is not None:
+            _validation_pool.shutdown()
+            _validation_pool = None
+        if _analysis_pool is not None:
+            _analysis_pool.shutdown()
+            _analysis_pool = None
+
+
+async def _run_cpu_bound(func, *args):
+    """
+    Run a CPU-heavy synchronous function without blocking the event loop:
+    in the analysis process pool when configured, else in the thread pool.
+    Arguments and results must be picklable for the process pool.
+    """
+    if _analysis_pool is not None:
+        return await asyncio.get_running_loop().run_in_executor(_analysis_pool, func, *args)
+    return await run_in_threadpool(func, *args)
+
+
+# orjson encodes large response bodies (e.g. every validated transaction)
+# far faster than the stdlib json encoder behind the default JSONResponse
+app = FastAPI(
+    title="Rift Money Muling API",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+# Upper bound on an uploaded CSV, in bytes (override with MAX_UPLOAD_BYTES)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject requests whose declared Content-Length exceeds the upload cap."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        return ORJSONResponse(
+            status_code=413,
+            content={"detail": f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit"},
+        )
+    return await call_next(request)
+
 
 # Configure CORS for deployment
 # Check if we're in production (Vercel sets this automatically)
@@ -73,6 +156,20 @@ else:
     )
 
 
+@lru_cache(maxsize=200_000)
+def _parse_timestamp_string(value: str) -> datetime:
+    """
+    Parse a timestamp string, reusing results for repeated values.
+
+    Well-formed ISO-8601 (including a trailing ``Z``) goes through the C
+    ``datetime.fromisoformat``; dateutil is only used for other formats.
+    """
+    try:
+        return datetime.fromisoformat(value.strip())
+    except ValueError:
+        return date_parser.parse(value)
+
+
 class Transaction(BaseModel):
     """Transaction model with validation and normalization."""
     transaction_id: str = Field(..., description="Unique transaction identifier")
@@ -81,25 +178,29 @@ class Transaction(BaseModel):
     amount: float = Field(..., gt=0, description="Transaction amount (must be positive)")
     timestamp: datetime = Field(..., description="Transaction timestamp")
 
-    @validator('amount', pre=True)
+    @field_validator('amount', mode='before')
+    @classmethod
     def validate_amount(cls, v):
-        """Convert amount to float and validate it's positive."""
+        """Convert amount to float and validate it's finite and positive."""
         try:
             amount = float(v)
+            if not math.isfinite(amount):
+                raise ValueError("Amount must be a finite number")
             if amount <= 0:
                 raise ValueError("Amount must be positive")
             return amount
         except (ValueError, TypeError) as e:
             raise ValueError(f"Invalid amount format: {v}")
 
-    @validator('timestamp', pre=True)
+    @field_validator('timestamp', mode='before')
+    @classmethod
     def validate_timestamp(cls, v):
         """Parse various timestamp formats into datetime."""
         if isinstance(v, datetime):
             return v
         if isinstance(v, str):
             try:
-                return date_parser.parse(v)
+                return _parse_timestamp_string(v)
             except (ValueError, TypeError) as e:
                 raise ValueError(f"Invalid timestamp format: {v}")
         raise ValueError(f"Invalid timestamp type: {type(v)}")
@@ -110,8 +211,25 @@ class CSVValidationResponse(BaseModel):
     success: bool
     message: str
     total_rows: int
+    valid_count: int = 0  # all valid rows, even when only a page is returned
     valid_transactions: List[Transaction] = []
     errors: List[dict] = []
+    errors_truncated: bool = False
+
+
+class CSVValidationColumnarResponse(BaseModel):
+    """Response model for CSV validation with transactions as parallel columns."""
+    success: bool
+    message: str
+    total_rows: int
+    valid_count: int = 0
+    transaction_ids: List[str] = []
+    sender_ids: List[str] = []
+    receiver_ids: List[str] = []
+    amounts: List[float] = []
+    timestamps: List[datetime] = []
+    errors: List[dict] = []
+    errors_truncated: bool = False
 
 
 class CSVValidationError(BaseModel):
@@ -143,6 +261,11 @@ class SuspiciousRing(BaseModel):
     transaction_count: Optional[int] = None
 
 
+# Detectors build rings from values they computed themselves, so they skip
+# validation; callers must pass correctly typed fields (floats as float).
+_new_ring = SuspiciousRing.model_construct
+
+
 class RingDetectionResponse(BaseModel):
     """Response model for ring detection analysis."""
     success: bool
@@ -152,6 +275,316 @@ class RingDetectionResponse(BaseModel):
     graph_stats: Dict[str, Any]
 
 
+# ---------------------------------------------------------------------------
+# CSV Validation (vectorised)
+# ---------------------------------------------------------------------------
+
+_ID_COLUMNS = ('transaction_id', 'sender_id', 'receiver_id')
+REQUIRED_COLUMNS = frozenset({*_ID_COLUMNS, 'amount', 'timestamp'})
+
+# Read ids as text up front so they are never inferred as numbers and
+# re-stringified row by row. Only the required columns are materialised;
+# a callable usecols skips extra columns without failing on missing ones, so
+# the required-column check still reports them. Timestamps are parsed after
+# that check (parse_dates would turn a missing column into a parser error).
+_CSV_READ_OPTIONS: Dict[str, Any] = {
+    'dtype': {col: str for col in _ID_COLUMNS},
+    'usecols': REQUIRED_COLUMNS.__contains__,
+}
+
+# Rows per chunk when streaming an upload; bounds parser memory to O(chunk)
+_CSV_CHUNK_ROWS = 50_000
+
+# Whole-file reads (the bundled CSVs) use pyarrow's multithreaded parser when
+# it is installed. Uploads always stream through the C engine, since pyarrow
+# cannot read in chunks. The C engine also skips extra columns, as uploads
+# do (pyarrow does not take a callable usecols).
+try:
+    import pyarrow  # noqa: F401
+    _FILE_CSV_OPTIONS: Dict[str, Any] = {'engine': 'pyarrow'}
+except ImportError:
+    _FILE_CSV_OPTIONS = {
+        'engine': 'c', 'low_memory': False, 'usecols': _CSV_READ_OPTIONS['usecols'],
+    }
+
+# Most row errors returned by /upload-csv; the rest are only counted
+MAX_REPORTED_ERRORS = 10_000
+
+# Uploads up to this size are first tried with the stdlib csv module, which
+# has far less fixed overhead than building a DataFrame for a few rows
+_SMALL_UPLOAD_BYTES = 128 * 1024
+
+# read_csv's default NA markers; an id equal to one of these is NaN in the
+# pandas path, so the small-upload path leaves such files to pandas
+_CSV_NA_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+    'n/a', 'nan', 'null',
+})
+
+
+class _SizeLimitedReader:
+    """
+    Read-through wrapper that aborts once more than ``limit`` bytes are read.
+
+    Covers uploads without a (truthful) Content-Length header, so the parser
+    never consumes more than the cap regardless of what the client sent.
+    """
+
+    def __init__(self, raw, limit: int):
+        self._raw = raw
+        self._limit = limit
+        self._consumed = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        self._consumed += len(data)
+        if self._consumed > self._limit:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Upload exceeds the {self._limit} byte limit"
+            )
+        return data
+
+    def __iter__(self):
+        return iter(self._raw)
+
+
+def _parse_timestamp_column(raw: pd.Series) -> pd.Series:
+    """
+    Parse a timestamp column in one vectorised pass.
+
+    Columns already parsed to datetimes are returned unchanged. Cells that
+    are not ISO-8601-like come back as NaT; so does the whole column when
+    it is not text or mixes timezone-aware and naive values. Callers send
+    NaT rows through full ``Transaction`` validation.
+    """
+    if pd.api.types.is_datetime64_any_dtype(raw):
+        return raw
+    if not pd.api.types.is_string_dtype(raw):
+        return pd.Series(pd.NaT, index=raw.index)
+    try:
+        # cache=True parses each distinct timestamp string only once
+        return pd.to_datetime(raw, format='ISO8601', errors='coerce', cache=True)
+    except (ValueError, TypeError):
+        return pd.Series(pd.NaT, index=raw.index)
+
+
+_TRANSACTION_FIELDS = frozenset(Transaction.model_fields)
+
+
+def _pack_transactions(
+    txn_ids: List[str],
+    sender_ids: List[str],
+    receiver_ids: List[str],
+    amounts: List[float],
+    timestamps: Any,
+) -> List[Transaction]:
+    """
+    Build Transaction instances from column values that already passed validation.
+
+    Produces the same instances as ``Transaction.model_construct`` with every
+    field supplied, but sets the instance state in one step per row instead
+    of walking the model's field definitions each time (about 2x faster).
+    This is the only place that writes pydantic's instance slots directly;
+    test_pack_transactions_matches_model_construct fails if pydantic changes
+    them.
+    """
+    new = Transaction.__new__
+    set_attr = object.__setattr__
+    # The row count is known up front: fill a preallocated list by index
+    transactions: List[Any] = [None] * len(txn_ids)
+    columns = zip(txn_ids, sender_ids, receiver_ids, amounts, timestamps)
+    for i, (txn_id, sender, receiver, amount, ts) in enumerate(columns):
+        transaction = new(Transaction)
+        set_attr(transaction, '__dict__', {
+            'transaction_id': txn_id,
+            'sender_id': sender,
+            'receiver_id': receiver,
+            'amount': amount,
+            'timestamp': ts,
+        })
+        set_attr(transaction, '__pydantic_fields_set__', set(_TRANSACTION_FIELDS))
+        set_attr(transaction, '__pydantic_extra__', None)
+        set_attr(transaction, '__pydantic_private__', None)
+        transactions[i] = transaction
+    return transactions
+
+
+def validate_transaction_frame(
+    csv_data: pd.DataFrame,
+    include_row_data: bool = True,
+) -> tuple[List[Transaction], List[dict]]:
+    """
+    Validate a transactions DataFrame column-by-column.
+
+    Returns the rows ``validate_transaction_columns`` accepts as
+    ``Transaction`` instances, in row order, plus the error dicts.
+    """
+    columns, errors = validate_transaction_columns(csv_data, include_row_data)
+    return _pack_transactions(*columns), errors
+
+
+def validate_transaction_columns(
+    csv_data: pd.DataFrame,
+    include_row_data: bool = True,
+) -> tuple[tuple[list, ...], List[dict]]:
+    """
+    Validate a transactions DataFrame column-by-column.
+
+    Rows that pass the vectorised checks (non-missing ids, positive finite
+    amount, ISO-8601 timestamp) are taken straight from the checked columns
+    and skip the per-field validators. Every other row goes through the full
+    ``Transaction`` model, so accepted values and error messages are the same
+    as validating each row individually.
+
+    Args:
+        csv_data: DataFrame containing the required transaction columns
+        include_row_data: Attach the raw row values to each error dict
+
+    Returns:
+        Tuple of (valid rows as ``(transaction_ids, sender_ids, receiver_ids,
+        amounts, timestamps)`` lists in row order, error dicts)
+    """
+    ids = [csv_data[col].astype(str).str.strip() for col in _ID_COLUMNS]
+    amounts = pd.to_numeric(csv_data['amount'], errors='coerce')
+    timestamps = _parse_timestamp_column(csv_data['timestamp'])
+
+    # One boolean buffer, narrowed in place column by column (NaN > 0 is
+    # False, so unparseable amounts drop out of the first comparison;
+    # infinite ones are left to the model, which rejects them)
+    amount_values = amounts.to_numpy(dtype=np.float64, na_value=np.nan)
+    fast_mask = amount_values > 0
+    fast_mask &= np.isfinite(amount_values)
+    fast_mask &= timestamps.notna().to_numpy()
+    for col in ids:
+        fast_mask &= col.notna().to_numpy()
+
+    fast_positions = np.flatnonzero(fast_mask)
+    fast_columns = (
+        ids[0].iloc[fast_positions].tolist(),
+        ids[1].iloc[fast_positions].tolist(),
+        ids[2].iloc[fast_positions].tolist(),
+        amount_values[fast_positions].tolist(),
+        timestamps.iloc[fast_positions].dt.to_pydatetime().tolist(),
+    )
+
+    slow_positions = np.flatnonzero(~fast_mask)
+    if not len(slow_positions):
+        return fast_columns, []
+
+    valid_positions: List[int] = []
+    valid_rows: List[Transaction] = []
+    errors = []
+    slow_rows = csv_data.iloc[slow_positions]
+    # Reuse the column-wise stripped ids; missing cells keep their plain
+    # str() form ('nan') so the model reports them exactly as before
+    slow_ids = [
+        col.iloc[slow_positions].fillna(slow_rows[name].map(str)).tolist()
+        for name, col in zip(_ID_COLUMNS, ids)
+    ]
+    rows = zip(slow_positions, *slow_ids, slow_rows.itertuples(index=True, name='Row'))
+    for pos, txn_id, sender, receiver, row in rows:
+        try:
+            valid_rows.append(Transaction(
+                transaction_id=txn_id,
+                sender_id=sender,
+                receiver_id=receiver,
+                amount=row.amount,
+                timestamp=row.timestamp,
+            ))
+            valid_positions.append(pos)
+        except Exception as e:
+            error = {
+                'row': row.Index + 1,  # 1-based row numbering
+                'error': str(e),
+            }
+            if include_row_data:
+                row_data = row._asdict()
+                row_data.pop('Index')
+                error['data'] = row_data
+            errors.append(error)
+
+    if not valid_rows:
+        return fast_columns, errors
+    # Interleave the model-validated rows back into row order
+    order = np.argsort(
+        np.concatenate((fast_positions, valid_positions)), kind='stable'
+    ).tolist()
+    columns = []
+    for values, field in zip(fast_columns, (*_ID_COLUMNS, 'amount', 'timestamp')):
+        combined = values + [getattr(t, field) for t in valid_rows]
+        columns.append([combined[i] for i in order])
+    return tuple(columns), errors
+
+
+def _read_transactions_file(path: str) -> pd.DataFrame:
+    """Read a transactions CSV from disk in one pass with text-typed ids."""
+    return pd.read_csv(path, dtype=_CSV_READ_OPTIONS['dtype'], **_FILE_CSV_OPTIONS)
+
+
+def _validate_small_csv(content: bytes) -> Optional[List[Transaction]]:
+    """``_validate_small_csv_columns`` packed into ``Transaction`` instances."""
+    columns = _validate_small_csv_columns(content)
+    return _pack_transactions(*columns) if columns is not None else None
+
+
+def _validate_small_csv_columns(content: bytes) -> Optional[tuple[list, ...]]:
+    """
+    Validate a small CSV with the stdlib ``csv`` module, skipping pandas.
+
+    Only handles the clean case: returns the transaction columns, as
+    ``validate_transaction_columns`` does, when every row has
+    non-NA ids, a positive amount and an ISO-8601 timestamp. Returns None for
+    anything else (bad encoding, missing columns, ragged rows, a single bad
+    value) so the caller re-runs the file through the pandas path and row
+    errors are reported exactly as before.
+    """
+    try:
+        text = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return None
+
+    reader = csv.reader(io.StringIO(text, newline=''))
+    header = next(reader, None)
+    if not header or len(set(header)) != len(header) or not REQUIRED_COLUMNS.issubset(header):
+        return None
+    positions = [header.index(col) for col in (*_ID_COLUMNS, 'amount', 'timestamp')]
+    width = len(header)
+
+    txn_ids, sender_ids, receiver_ids, amounts, timestamps = [], [], [], [], []
+    for row in reader:
+        if not row:
+            continue  # read_csv skips blank lines too
+        if len(row) != width:
+            return None
+        txn_id, sender, receiver, amount, timestamp = [row[i] for i in positions]
+        if txn_id in _CSV_NA_VALUES or sender in _CSV_NA_VALUES or receiver in _CSV_NA_VALUES:
+            return None
+        # pandas' float parser can round 16-17 digit decimals differently
+        # from float(); leave those to pandas so amounts match bit for bit
+        if len(amount) > 15:
+            return None
+        # All-digit timestamps make read_csv type the column as numbers,
+        # which the model rejects
+        if timestamp.strip().isdigit():
+            return None
+        try:
+            amount = float(amount)
+            timestamp = datetime.fromisoformat(timestamp.strip())
+        except ValueError:
+            return None
+        if not (amount > 0 and math.isfinite(amount)):
+            return None
+        txn_ids.append(txn_id.strip())
+        sender_ids.append(sender.strip())
+        receiver_ids.append(receiver.strip())
+        amounts.append(amount)
+        timestamps.append(timestamp)
+
+    return txn_ids, sender_ids, receiver_ids, amounts, timestamps
+
+
 @app.get("/")
 def read_root() -> dict[str, Any]:
     return {
@@ -180,71 +613,87 @@ def handle_options(path: str):
     return {"message": "OK"}
 
 
-@app.post("/upload-csv", response_model=CSVValidationResponse)
-async def upload_csv(file: UploadFile = File(...)) -> CSVValidationResponse:
+def _validate_csv_stream(stream, include_row_data: bool, pool: Optional[ProcessPoolExecutor]):
     """
-    Upload and validate CSV file containing transaction data.
-    
-    Required columns: transaction_id, sender_id, receiver_id, amount, timestamp
+    Parse an uploaded CSV stream chunk by chunk and validate each chunk.
+
+    Returns ``(total_rows, chunk_results)``; with a pool the results are
+    futures, otherwise ``(columns, errors)`` tuples from
+    ``validate_transaction_columns``, in chunk order.
     """
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="File must be a CSV")
-    
-    try:
-        # Read CSV content
-        content = await file.read()
-        csv_data = pd.read_csv(io.StringIO(content.decode('utf-8')))
-        
+    # Stream the upload through the parser in bounded chunks rather than
+    # holding the raw bytes, a decoded copy and one big DataFrame at once.
+    # The C parser reads and decodes the spooled upload file directly;
+    # no Python-level bytes or str copy of the payload is made
+    reader = pd.read_csv(
+        _SizeLimitedReader(stream, MAX_UPLOAD_BYTES), encoding='utf-8', engine='c',
+        chunksize=_CSV_CHUNK_ROWS, **_CSV_READ_OPTIONS
+    )
+    # With a worker pool, chunks are validated in other processes while
+    # the parser reads ahead
+    total_rows = 0
+    chunk_results = []
+    for csv_data in reader:
         # Validate required columns
-        required_columns = {'transaction_id', 'sender_id', 'receiver_id', 'amount', 'timestamp'}
-        missing_columns = required_columns - set(csv_data.columns)
-        
+        missing_columns = REQUIRED_COLUMNS.difference(csv_data.columns)
+
         if missing_columns:
             raise HTTPException(
-                status_code=400, 
+                status_code=400,
                 detail=f"Missing required columns: {', '.join(missing_columns)}"
             )
-        
-        # Process each row
-        valid_transactions = []
-        errors = []
-        
-        for idx, row in csv_data.iterrows():
-            try:
-                # Create transaction with validation
-                transaction_data = {
-                    'transaction_id': str(row['transaction_id']).strip(),
-                    'sender_id': str(row['sender_id']).strip(),
-                    'receiver_id': str(row['receiver_id']).strip(),
-                    'amount': row['amount'],
-                    'timestamp': row['timestamp']
-                }
-                
-                # Validate transaction
-                transaction = Transaction(**transaction_data)
-                valid_transactions.append(transaction)
-                
-            except Exception as e:
-                errors.append({
-                    'row': idx + 1,  # 1-based row numbering
-                    'error': str(e),
-                    'data': row.to_dict()
-                })
-        
-        # Prepare response
-        success = len(errors) == 0
-        message = f"Successfully processed {len(valid_transactions)} transactions"
-        if errors:
-            message += f" with {len(errors)} errors"
-        
-        return CSVValidationResponse(
-            success=success,
-            message=message,
-            total_rows=len(csv_data),
-            valid_transactions=valid_transactions,
-            errors=errors
+
+        # Validate all rows (vectorised column checks + per-row fallback)
+        if pool is None:
+            chunk_results.append(validate_transaction_columns(csv_data, include_row_data))
+        else:
+            chunk_results.append(pool.submit(validate_transaction_columns, csv_data, include_row_data))
+        total_rows += len(csv_data)
+    return total_rows, chunk_results
+
+
+async def _validate_upload(
+    file: UploadFile,
+    include_row_data: bool,
+) -> tuple[int, tuple[list, ...], List[dict], int]:
+    """
+    Validate an uploaded CSV for ``/upload-csv`` and its columnar variant.
+
+    Returns ``(total_rows, columns, errors, error_count)``: the valid rows as
+    ``validate_transaction_columns`` lays them out, and at most
+    ``MAX_REPORTED_ERRORS`` error dicts out of ``error_count``.
+    """
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+
+    try:
+        # Small, clean uploads are validated without pandas
+        if file.size is not None and file.size <= min(_SMALL_UPLOAD_BYTES, MAX_UPLOAD_BYTES):
+            small = _validate_small_csv_columns(file.file.read())
+            if small is not None:
+                return len(small[0]), small, [], 0
+            file.file.seek(0)
+
+        # Parsing runs in a worker thread so the event loop stays responsive
+        pool = _validation_pool
+        total_rows, chunk_results = await run_in_threadpool(
+            _validate_csv_stream, file.file, include_row_data, pool
         )
-        
+        if pool is not None:
+            chunk_results = await asyncio.gather(*map(asyncio.wrap_future, chunk_results))
+
+        columns: tuple[list, ...] = ([], [], [], [], [])
+        errors: List[dict] = []
+        error_count = 0
+        for chunk_columns, chunk_errors in chunk_results:
+            for values, chunk_values in zip(columns, chunk_columns):
+                values.extend(chunk_values)
+            error_count += len(chunk_errors)
+            errors.extend(chunk_errors[:MAX_REPORTED_ERRORS - len(errors)])
+        return total_rows, columns, errors, error_count
+
+    except HTTPException:
+        raise
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=400, detail="CSV file is empty")
     except pd.errors.ParserError as e:
@@ -255,6 +704,377 @@ async def upload_csv(file: UploadFile = File(...)) -> CSVValidationResponse:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+def _upload_message(valid_count: int, error_count: int) -> str:
+    """Summary line shared by the ``/upload-csv`` responses."""
+    message = f"Successfully processed {valid_count} transactions"
+    if error_count:
+        message += f" with {error_count} errors"
+    return message
+
+
+@app.post("/upload-csv", response_model=CSVValidationResponse, response_class=ORJSONResponse)
+async def upload_csv(
+    file: UploadFile = File(...),
+    include_row_data: bool = False,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> CSVValidationResponse:
+    """
+    Upload and validate CSV file containing transaction data.
+
+    Required columns: transaction_id, sender_id, receiver_id, amount, timestamp
+
+    Error entries carry the offending row's raw values only when
+    ``include_row_data`` is set, and at most ``MAX_REPORTED_ERRORS`` of them
+    are returned (``errors_truncated`` flags the rest).
+
+    ``offset``/``limit`` page the returned ``valid_transactions``
+    (``limit=0`` returns counts and errors only); ``valid_count`` always
+    reports the full number of valid rows.
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise HTTPException(status_code=400, detail="offset and limit must be non-negative")
+
+    total_rows, columns, errors, error_count = await _validate_upload(file, include_row_data)
+    valid_count = len(columns[0])
+
+    # Only the requested page is turned into Transaction objects
+    end = valid_count if limit is None else offset + limit
+    return CSVValidationResponse(
+        success=error_count == 0,
+        message=_upload_message(valid_count, error_count),
+        total_rows=total_rows,
+        valid_count=valid_count,
+        valid_transactions=_pack_transactions(*(values[offset:end] for values in columns)),
+        errors=errors,
+        errors_truncated=error_count > len(errors),
+    )
+
+
+@app.post("/upload-csv/columnar", response_model=CSVValidationColumnarResponse)
+async def upload_csv_columnar(
+    file: UploadFile = File(...),
+    include_row_data: bool = False,
+) -> CSVValidationColumnarResponse:
+    """
+    Upload and validate a CSV file, returning valid transactions column-wise.
+
+    Same validation as ``/upload-csv``, but the transactions come back as five
+    parallel arrays instead of one object per row, so field names are not
+    repeated for every transaction and the payload is much smaller. The
+    arrays are the validated columns themselves; no per-row objects are built.
+    """
+    total_rows, columns, errors, error_count = await _validate_upload(file, include_row_data)
+    transaction_ids, sender_ids, receiver_ids, amounts, timestamps = columns
+
+    return CSVValidationColumnarResponse(
+        success=error_count == 0,
+        message=_upload_message(len(transaction_ids), error_count),
+        total_rows=total_rows,
+        valid_count=len(transaction_ids),
+        transaction_ids=transaction_ids,
+        sender_ids=sender_ids,
+        receiver_ids=receiver_ids,
+        amounts=amounts,
+        timestamps=timestamps,
+        errors=errors,
+        errors_truncated=error_count > len(errors),
+    )
+
+
+class _memoized_property:
+    """
+    ``cached_property`` that locks per instance rather than per class.
+
+    On Python 3.11 ``cached_property`` computes under one lock shared by
+    every instance of the class, so analysis of one dataset waits on
+    another's. Here each instance gets its own re-entrant lock (properties
+    read each other), taken only until the value is stored; the stored
+    instance attribute then shadows this descriptor.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        state = instance.__dict__
+        with state.setdefault('_memo_lock', threading.RLock()):
+            if self.name not in state:
+                state[self.name] = self.func(instance)
+            return state[self.name]
+
+
+# ---------------------------------------------------------------------------
+# Transaction edge table (structure of arrays)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class TxnTable:
+    """
+    Column-wise view of a transaction graph's edges.
+
+    Edge ``i`` runs from ``nodes[src[i]]`` to ``nodes[dst[i]]``. Edge arrays
+    are in insertion (transaction) order; ``edge_order`` lists edge positions
+    in the order ``G.edges()`` yields them, so output built from the table
+    keeps the graph's ordering.
+    """
+    nodes: np.ndarray       # account ids (object), in graph node order
+    src: np.ndarray         # int64 index into nodes
+    dst: np.ndarray         # int64 index into nodes
+    amount: np.ndarray      # float64
+    ts_us: np.ndarray       # int64 epoch microseconds, UTC (naive taken as UTC)
+    timestamps: np.ndarray  # original timestamp objects
+    ts_iso: np.ndarray      # timestamps as serialised in API output (object)
+    tx_ids: np.ndarray      # transaction ids (object)
+    edge_order: np.ndarray  # int64 permutation into the edge arrays
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    @_memoized_property
+    def sorted_order(self) -> np.ndarray:
+        """Node positions in account-id order, computed once per table."""
+        return np.argsort(self.nodes, kind='stable')
+
+    @_memoized_property
+    def ts_rank(self) -> np.ndarray:
+        """Rank of each serialised timestamp, in ``edge_order`` order."""
+        ranks, _ = pd.factorize(self.ts_iso[self.edge_order], sort=True)
+        return ranks
+
+    @_memoized_property
+    def outgoing(self) -> "AccountTxns":
+        """Each sender's transactions, laid out as ``create_transaction_maps``."""
+        return _account_txns(self, self.src, self.dst)
+
+    @_memoized_property
+    def incoming(self) -> "AccountTxns":
+        """Each receiver's transactions, laid out as ``create_transaction_maps``."""
+        return _account_txns(self, self.dst, self.src)
+
+
+@dataclass
+class AccountTxns:
+    """
+    One transaction map (outgoing or incoming) as a structure of arrays.
+
+    The transactions of ``accounts[k]`` are rows ``indptr[k]:indptr[k + 1]``
+    of the row arrays, in the same account and timestamp order as the
+    dict-of-lists map. ``peer`` holds each row's counterparty.
+    """
+    accounts: np.ndarray  # account ids (object), in map key order
+    indptr: np.ndarray    # int64, len(accounts) + 1
+    rows: np.ndarray      # int64 positions into the edge table
+    peer: np.ndarray      # counterparty ids (object)
+    ts_us: np.ndarray     # int64 epoch microseconds, UTC
+
+    @_memoized_property
+    def position(self) -> Dict[str, int]:
+        """Account id -> index into ``accounts``."""
+        return {account: k for k, account in enumerate(self.accounts.tolist())}
+
+
+def _object_array(values: List[Any]) -> np.ndarray:
+    """Build a 1-D object array without numpy unpacking nested values."""
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _to_epoch_us(timestamps: List[Any]) -> np.ndarray:
+    """
+    Convert timestamps to int64 UTC epoch microseconds in one pass.
+
+    Microseconds are datetime's own resolution and, unlike nanoseconds,
+    cover every year a datetime can hold (nanoseconds overflow outside
+    1677-2262).
+    """
+    return pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True)).as_unit('us').asi8
+
+
+def _iso_strings(timestamps: List[Any], ts_us: np.ndarray) -> np.ndarray:
+    """
+    ``ts.isoformat()`` for every timestamp (``str(ts)`` for non-datetimes).
+
+    When all timestamps are plain datetimes sharing one fixed-offset tzinfo
+    (or none), the strings are formatted from ``ts_us`` with numpy
+    instead; otherwise each timestamp is formatted on its own.
+    """
+    kinds = {(type(ts), getattr(ts, 'tzinfo', None)) for ts in timestamps}
+    if len(kinds) == 1:
+        kind, tz = next(iter(kinds))
+        offset = tz.utcoffset(None) if tz is not None else timedelta(0)
+    if len(kinds) != 1 or kind is not datetime or offset is None:
+        return _object_array([
+            ts.isoformat() if hasattr(ts, 'isoformat') else str(ts) for ts in timestamps
+        ])
+
+    # Wall-clock time in the shared zone; isoformat() drops a zero fraction
+    local_us = ts_us + offset // timedelta(microseconds=1)
+    local = local_us.view('datetime64[us]')
+    iso = np.datetime_as_string(local, unit='s').astype(object)
+    fractional = np.flatnonzero(local_us % 1_000_000)
+    if fractional.size:
+        iso[fractional] = np.datetime_as_string(local[fractional], unit='us')
+    if tz is not None:
+        iso += datetime(2000, 1, 1, tzinfo=tz).isoformat()[19:]
+    return iso
+
+
+def build_txn_table(transactions: List[Transaction]) -> TxnTable:
+    """
+    Build the edge table for the graph ``build_transaction_graph`` produces.
+
+    Node ids are factorised over the interleaved sender/receiver sequence,
+    which reproduces the graph's node insertion order.
+    """
+    count = len(transactions)
+    endpoints = _object_array(
+        [account for t in transactions for account in (t.sender_id, t.receiver_id)]
+    )
+    codes, nodes = pd.factorize(endpoints)
+    src = codes[0::2].astype(np.int64)
+    dst = codes[1::2].astype(np.int64)
+
+    # G.edges() walks sources in node order, then each source's successors
+    # in first-seen order, then parallel edges in insertion order
+    pair_codes, _ = pd.factorize(src * max(len(nodes), 1) + dst)
+    edge_order = np.lexsort((np.arange(count), pair_codes, src))
+
+    timestamps = [t.timestamp for t in transactions]
+    ts_us = _to_epoch_us(timestamps)
+    return TxnTable(
+        nodes=nodes,
+        src=src,
+        dst=dst,
+        amount=np.fromiter((t.amount for t in transactions), dtype=np.float64, count=count),
+        ts_us=ts_us,
+        timestamps=_object_array(timestamps),
+        ts_iso=_iso_strings(timestamps, ts_us),
+        tx_ids=_object_array([t.transaction_id for t in transactions]),
+        edge_order=edge_order,
+    )
+
+
+def _txn_table_from_graph(G: nx.MultiDiGraph) -> TxnTable:
+    """Build the edge table by walking a graph that was assembled by hand."""
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = list(G.edges(data=True))
+    count = len(edges)
+    timestamps = [data.get('timestamp') for _, _, data in edges]
+    ts_us = _to_epoch_us(timestamps)
+    return TxnTable(
+        nodes=_object_array(nodes),
+        src=np.fromiter((index[u] for u, _, _ in edges), dtype=np.int64, count=count),
+        dst=np.fromiter((index[v] for _, v, _ in edges), dtype=np.int64, count=count),
+        amount=np.fromiter((data.get('amount', 0.0) for _, _, data in edges), dtype=np.float64, count=count),
+        ts_us=ts_us,
+        timestamps=_object_array(timestamps),
+        ts_iso=_iso_strings(timestamps, ts_us),
+        tx_ids=_object_array([data.get('tx_id', data.get('transaction_id')) for _, _, data in edges]),
+        edge_order=np.arange(count, dtype=np.int64),
+    )
+
+
+def edge_table(G: nx.MultiDiGraph) -> TxnTable:
+    """
+    Return the graph's edge table, building and caching it on first use.
+
+    Graphs from ``build_transaction_graph`` carry their table already; for
+    other graphs it is derived from the edge data and cached separately.
+    Tables live in ``G.__networkx_cache__``, which networkx clears whenever
+    nodes or edges are added or removed, so a changed graph gets a fresh
+    table. After editing edge attributes in place, call
+    ``G.__networkx_cache__.clear()``.
+    """
+    table = G.__networkx_cache__.get('txn_table')
+    if table is None:
+        table = G.__networkx_cache__.get('_derived_txn_table')
+    if table is None:
+        table = _txn_table_from_graph(G)
+        G.__networkx_cache__['_derived_txn_table'] = table
+    return table
+
+
+def _account_txns(table: TxnTable, owner: np.ndarray, other: np.ndarray) -> AccountTxns:
+    """
+    Group the table's edges by ``owner`` node: accounts in first-seen
+    ``G.edges()`` order, rows within an account stably sorted by their
+    serialised timestamp (the order the dict-of-lists maps use).
+    """
+    order = table.edge_order
+    keys = owner[order]
+    if len(keys) == 0:
+        perm = np.empty(0, dtype=np.int64)
+        indptr = np.zeros(1, dtype=np.int64)  # no accounts
+    else:
+        # Rows sort by ISO-string rank, the same key as the maps
+        group, _ = pd.factorize(keys)
+        perm = np.lexsort((table.ts_rank, group))  # lexsort is stable
+        bounds = np.flatnonzero(np.diff(group[perm])) + 1
+        indptr = np.concatenate(([0], bounds, [len(perm)])).astype(np.int64)
+    rows = order[perm]
+    return AccountTxns(
+        accounts=table.nodes[owner[rows[indptr[:-1]]]],
+        indptr=indptr,
+        rows=rows,
+        peer=table.nodes[other[rows]],
+        ts_us=table.ts_us[rows],
+    )
+
+
+def account_txns(G: nx.MultiDiGraph) -> Optional[tuple[AccountTxns, AccountTxns]]:
+    """
+    ``(outgoing, incoming)`` structure-of-arrays views matching
+    ``create_transaction_maps(G)``, or None for graphs assembled by hand
+    (their maps are ordered by the raw timestamp values instead).
+    """
+    table = G.__networkx_cache__.get('txn_table')
+    if table is None:
+        return None
+    return table.outgoing, table.incoming
+
+
+def _unique_edge_pairs(G: nx.MultiDiGraph) -> List[tuple]:
+    """Distinct (sender, receiver) pairs in ``G.edges()`` order."""
+    table = edge_table(G)
+    order = table.edge_order
+    src = table.src[order]
+    dst = table.dst[order]
+    _, first = np.unique(src * max(len(table.nodes), 1) + dst, return_index=True)
+    first.sort()
+    return list(zip(table.nodes[src[first]].tolist(), table.nodes[dst[first]].tolist()))
+
+
+def edge_amounts(G: nx.MultiDiGraph) -> List[float]:
+    """Edge amounts in ``G.edges()`` order, read from the edge table."""
+    table = edge_table(G)
+    return table.amount[table.edge_order].tolist()
+
+
+def is_weakly_connected(G: nx.MultiDiGraph) -> bool:
+    """
+    ``nx.is_weakly_connected`` computed from the edge table with scipy's
+    compiled connected-components routine. An empty graph is not connected.
+    """
+    table = edge_table(G)
+    n = len(table.nodes)
+    if n == 0:
+        return False
+    adjacency = coo_matrix(
+        (np.ones(len(table), dtype=np.int32), (table.src, table.dst)), shape=(n, n)
+    )
+    component_count, _ = connected_components(adjacency, directed=True, connection='weak')
+    return bool(component_count == 1)
+
+
 def build_transaction_graph(transactions: List[Transaction]) -> nx.MultiDiGraph:
     """
     Build a NetworkX MultiDiGraph from transaction data.
@@ -265,19 +1085,28 @@ def build_transaction_graph(transactions: List[Transaction]) -> nx.MultiDiGraph:
     Returns:
         NetworkX MultiDiGraph with transactions as edges
     """
+    # Column-wise copy of the edges for the vectorised pipeline stages
+    table = build_txn_table(transactions)
+
     G = nx.MultiDiGraph()
-    
-    for transaction in transactions:
-        # Add edge from sender to receiver with transaction data
-        G.add_edge(
-            transaction.sender_id,
-            transaction.receiver_id,
-            transaction_id=transaction.transaction_id,
-            amount=transaction.amount,
-            timestamp=transaction.timestamp,
-            tx_id=transaction.transaction_id  # Alternative name as shown in user's structure
+    # Edges come from the table's columns rather than the Transaction objects
+    attrs = (
+        {
+            'transaction_id': tx_id,
+            'amount': amount,
+            'timestamp': timestamp,
+            'tx_id': tx_id,  # Alternative name as shown in user's structure
+        }
+        for tx_id, amount, timestamp in zip(
+            table.tx_ids.tolist(), table.amount.tolist(), table.timestamps.tolist()
         )
-    
+    )
+    G.add_edges_from(zip(
+        table.nodes[table.src].tolist(), table.nodes[table.dst].tolist(), attrs
+    ))
+
+    # Cached only now: networkx clears the cache whenever the graph changes
+    G.__networkx_cache__['txn_table'] = table
     return G
 
 
@@ -292,17 +1121,27 @@ def graph_to_json(G: nx.MultiDiGraph) -> Dict[str, Any]:
         Dictionary with nodes and edges in Cytoscape.js format
     """
     nodes = [{"id": node} for node in G.nodes()]
-    
-    edges = []
-    for u, v, key, data in G.edges(keys=True, data=True):
-        edges.append({
-            "id": data["tx_id"],
+
+    table = edge_table(G)
+    order = table.edge_order
+    columns = zip(
+        table.tx_ids[order].tolist(),
+        table.nodes[table.src[order]].tolist(),
+        table.nodes[table.dst[order]].tolist(),
+        table.amount[order].tolist(),
+        table.ts_iso[order].tolist(),
+    )
+    edges = [
+        {
+            "id": tx_id,
             "source": u,
             "target": v,
-            "amount": data["amount"],
-            "timestamp": data["timestamp"].isoformat() if hasattr(data["timestamp"], 'isoformat') else str(data["timestamp"])
-        })
-    
+            "amount": amount,
+            "timestamp": ts
+        }
+        for tx_id, u, v, amount, ts in columns
+    ]
+
     return {"nodes": nodes, "edges": edges}
 
 
@@ -316,27 +1155,107 @@ def convert_to_simple_graph(G: nx.MultiDiGraph) -> nx.DiGraph:
     Returns:
         NetworkX DiGraph
     """
-    simple_G = nx.DiGraph()
+    return nx.DiGraph(_unique_edge_pairs(G))
 
-    for u, v in G.edges():
-        simple_G.add_edge(u, v)
 
-    return simple_G
+MAX_CYCLE_LENGTH = 5
 
 
-def detect_cycles(G: nx.MultiDiGraph) -> List[List[str]]:
+def detect_cycles(G: nx.MultiDiGraph, max_length: int = MAX_CYCLE_LENGTH) -> List[List[str]]:
     """
-    Detect all cycles in the graph.
-    
+    Detect cycles of up to ``max_length`` members in the graph.
+
+    Longer cycles are never reported as rings, so rather than a general
+    cycle search, each cycle is enumerated from its smallest account id over
+    the CSR adjacency, only along paths that can still get back to it within
+    ``max_length`` hops. Cycles come out in sorted-id order of that first
+    member, independent of hash seeds.
+
     Args:
         G: NetworkX MultiDiGraph
-        
+        max_length: Longest cycle to enumerate
+
     Returns:
         List of cycles (each cycle is a list of node IDs)
     """
-    simple_G = convert_to_simple_graph(G)
-    all_cycles = list(nx.simple_cycles(simple_G))
-    return all_cycles
+    names, indptr, indices = sorted_csr_adjacency(G)
+    n = len(names)
+    if n == 0 or max_length < 1:
+        return []
+
+    # Only nodes in a strongly connected component with another node can lie
+    # on a cycle longer than a self-loop
+    adjacency = csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr), shape=(n, n))
+    _, component = connected_components(adjacency, directed=True, connection='strong')
+    on_cycle = np.bincount(component)[component] > 1
+
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    keep = on_cycle[src] & on_cycle[indices] & (src != indices)
+    succ = _adjacency_lists(n, src[keep], indices[keep])
+    pred = _adjacency_lists(n, indices[keep], src[keep])
+    self_loops = set(src[src == indices].tolist())
+
+    cycles: List[List[str]] = []
+    for root in range(n):
+        if root in self_loops:
+            cycles.append([names[root]])
+        if not on_cycle[root] or max_length < 2:
+            continue
+        for cycle in _cycles_through_root(root, succ, pred, max_length):
+            cycles.append([names[node] for node in cycle])
+    return cycles
+
+
+def _adjacency_lists(n: int, src: np.ndarray, dst: np.ndarray) -> List[List[int]]:
+    """Per-node neighbour lists (ascending) from parallel ``src``/``dst`` arrays."""
+    order = np.lexsort((dst, src))
+    bounds = np.searchsorted(src[order], np.arange(n + 1, dtype=np.int64)).tolist()
+    dst = dst[order].tolist()
+    return [dst[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+
+def _cycles_through_root(root: int, succ: List[List[int]], pred: List[List[int]],
+                         max_length: int):
+    """
+    Yield the cycles of 2..``max_length`` nodes whose smallest node is ``root``,
+    each starting at ``root``, so every cycle is found exactly once.
+    """
+    # Hops from each node back to root, through nodes above root only. The
+    # search meets it halfway: nodes not reached within ``reach`` hops are
+    # taken to be ``reach + 1`` away, still a lower bound for pruning
+    reach = max_length // 2
+    hops = {root: 0}
+    frontier = [root]
+    for depth in range(1, reach + 1):
+        next_frontier = []
+        for node in frontier:
+            for prev in pred[node]:
+                if prev > root and prev not in hops:
+                    hops[prev] = depth
+                    next_frontier.append(prev)
+        frontier = next_frontier
+    if len(hops) == 1:
+        return
+
+    # Extend a path from root only onto nodes that can still close the cycle
+    # within max_length
+    path = [root]
+    on_path = {root}
+    stack = [iter(succ[root])]
+    while stack:
+        for node in stack[-1]:
+            if node == root:
+                if len(path) > 1:
+                    yield list(path)
+            elif (node > root and node not in on_path
+                  and len(path) + hops.get(node, reach + 1) <= max_length):
+                path.append(node)
+                on_path.add(node)
+                stack.append(iter(succ[node]))
+                break
+        else:
+            stack.pop()
+            on_path.discard(path.pop())
 
 
 def filter_valid_cycles(cycles: List[List[str]]) -> List[List[str]]:
@@ -349,34 +1268,60 @@ def filter_valid_cycles(cycles: List[List[str]]) -> List[List[str]]:
     Returns:
         List of valid cycles (3-5 members)
     """
-    return [c for c in cycles if 3 <= len(c) <= 5]
+    return [c for c in cycles if 3 <= len(c) <= MAX_CYCLE_LENGTH]
 
 
-def calculate_ring_metrics(cycle: List[str], G: nx.MultiDiGraph) -> Dict[str, float]:
+def edge_pair_amounts(G: nx.MultiDiGraph) -> Dict[tuple, List[float]]:
+    """
+    Map each (sender, receiver) pair to the amounts of its parallel edges,
+    in edge-key order. Built once from the edge table so ring metrics can
+    look pairs up instead of walking the graph's adjacency per ring.
+    """
+    table = edge_table(G)
+    senders = table.nodes[table.src].tolist()
+    receivers = table.nodes[table.dst].tolist()
+    pair_amounts: Dict[tuple, List[float]] = defaultdict(list)
+    for u, v, amount in zip(senders, receivers, table.amount.tolist()):
+        pair_amounts[(u, v)].append(amount)
+    return dict(pair_amounts)
+
+
+def calculate_ring_metrics(
+    cycle: List[str],
+    G: nx.MultiDiGraph,
+    pair_amounts: Optional[Dict[tuple, List[float]]] = None,
+) -> Dict[str, float]:
     """
     Calculate metrics for a suspicious ring.
-    
+
     Args:
         cycle: List of account IDs in the ring
         G: NetworkX MultiDiGraph
-        
+        pair_amounts: Optional ``edge_pair_amounts(G)``, shared across rings
+
     Returns:
         Dictionary with ring metrics
     """
     total_amount = 0
     transaction_count = 0
-    
+
     # Calculate total amount and transaction count within the ring
     for i in range(len(cycle)):
         current = cycle[i]
         next_node = cycle[(i + 1) % len(cycle)]
-        
-        # Check if there's an edge from current to next_node
-        if G.has_edge(current, next_node):
-            for key, data in G[current][next_node].items():
-                total_amount += data.get('amount', 0)
-                transaction_count += 1
-    
+
+        if pair_amounts is not None:
+            amounts = pair_amounts.get((current, next_node), ())
+        elif G.has_edge(current, next_node):
+            amounts = [data.get('amount', 0) for data in G[current][next_node].values()]
+        else:
+            amounts = ()
+
+        # Summed one edge at a time, in key order, for reproducible totals
+        for amount in amounts:
+            total_amount += amount
+            transaction_count += 1
+
     # Calculate risk score based on amount and frequency
     risk_score = (total_amount / 100000) + (transaction_count * 0.1)  # Simple heuristic
     risk_score = min(risk_score, 10.0)  # Cap at 10
@@ -400,16 +1345,18 @@ def build_cycle_rings(valid_cycles: List[List[str]], G: nx.MultiDiGraph) -> List
         List of SuspiciousRing objects
     """
     rings = []
+    # Shared pair lookup; overlapping rings re-use the same (u, v) entries
+    pair_amounts = edge_pair_amounts(G) if valid_cycles else None
 
     for i, cycle in enumerate(valid_cycles, start=1):
-        metrics = calculate_ring_metrics(cycle, G)
+        metrics = calculate_ring_metrics(cycle, G, pair_amounts)
         
-        rings.append(SuspiciousRing(
+        rings.append(_new_ring(
             ring_id=f"RING_{i:03}",
             members=sorted(cycle),
             pattern="cycle",
-            risk_score=metrics['risk_score'],
-            total_amount=metrics['total_amount'],
+            risk_score=float(metrics['risk_score']),
+            total_amount=float(metrics['total_amount']),
             transaction_count=metrics['transaction_count']
         ))
 
@@ -431,6 +1378,32 @@ def cycle_detector(G: nx.MultiDiGraph) -> List[SuspiciousRing]:
     return build_cycle_rings(valid_cycles, G)
 
 
+def _transaction_maps_from_edges(G: nx.MultiDiGraph) -> tuple[Dict[str, List[Dict]], Dict[str, List[Dict]]]:
+    """
+    Build the transaction maps by walking the graph's edges, copying every
+    edge attribute. Used for graphs not built by ``build_transaction_graph``.
+    """
+    outgoing_map = defaultdict(list)
+    incoming_map = defaultdict(list)
+
+    # One pass fills both maps; each gets its own copy of the edge data,
+    # with the timestamp converted to a string for JSON serialization
+    for u, v, data in G.edges(data=True):
+        timestamp = data['timestamp'].isoformat()
+        outgoing_map[u].append({**data, 'timestamp': timestamp, 'receiver_id': v})
+        incoming_map[v].append({**data, 'timestamp': timestamp, 'sender_id': u})
+
+    # Sort by timestamp
+    by_timestamp = itemgetter("timestamp")
+    for txns in outgoing_map.values():
+        txns.sort(key=by_timestamp)
+
+    for txns in incoming_map.values():
+        txns.sort(key=by_timestamp)
+    
+    return dict(outgoing_map), dict(incoming_map)
+
+
 def create_transaction_maps(G: nx.MultiDiGraph) -> tuple[Dict[str, List[Dict]], Dict[str, List[Dict]]]:
     """
     Create outgoing and incoming transaction maps from the graph.
@@ -441,33 +1414,38 @@ def create_transaction_maps(G: nx.MultiDiGraph) -> tuple[Dict[str, List[Dict]],
     Returns:
         Tuple of (outgoing_map, incoming_map) sorted by timestamp
     """
-    outgoing_map = {}
-    incoming_map = {}
-    
-    # Build outgoing map (transactions sent by each account)
-    for u, v, data in G.edges(data=True):
-        # Convert datetime to string for JSON serialization
-        transaction_data = data.copy()
-        transaction_data['timestamp'] = data['timestamp'].isoformat()
-        transaction_data['receiver_id'] = v  # Include receiver in outgoing data
-        outgoing_map.setdefault(u, []).append(transaction_data)
-    
-    # Build incoming map (transactions received by each account)
-    for u, v, data in G.edges(data=True):
-        # Convert datetime to string for JSON serialization
-        transaction_data = data.copy()
-        transaction_data['timestamp'] = data['timestamp'].isoformat()
-        transaction_data['sender_id'] = u  # Include sender in incoming data
-        incoming_map.setdefault(v, []).append(transaction_data)
-    
-    # Sort by timestamp
-    for acc in outgoing_map:
-        outgoing_map[acc].sort(key=lambda x: x["timestamp"])
-    
-    for acc in incoming_map:
-        incoming_map[acc].sort(key=lambda x: x["timestamp"])
-    
-    return outgoing_map, incoming_map
+    views = account_txns(G)
+    if views is None:
+        return _transaction_maps_from_edges(G)
+    table = G.__networkx_cache__['txn_table']
+    # Sender data names the receiver and vice versa
+    return (
+        _materialise_map(table, views[0], 'receiver_id'),
+        _materialise_map(table, views[1], 'sender_id'),
+    )
+
+
+def _materialise_map(table: TxnTable, view: AccountTxns, peer_key: str) -> Dict[str, List[Dict]]:
+    """Expand a structure-of-arrays view into the dict-of-lists map form."""
+    tx_ids = table.tx_ids[view.rows].tolist()
+    amounts = table.amount[view.rows].tolist()
+    timestamps = table.ts_iso[view.rows].tolist()  # pre-serialised
+    peers = view.peer.tolist()
+    bounds = view.indptr.tolist()
+
+    txn_map = {}
+    for k, account in enumerate(view.accounts.tolist()):
+        txn_map[account] = [
+            {
+                'transaction_id': tx_ids[i],
+                'amount': amounts[i],
+                'timestamp': timestamps[i],
+                'tx_id': tx_ids[i],
+                peer_key: peers[i],
+            }
+            for i in range(bounds[k], bounds[k + 1])
+        ]
+    return txn_map
 
 
 # ---------------------------------------------------------------------------
@@ -476,6 +1454,7 @@ def create_transaction_maps(G: nx.MultiDiGraph) -> tuple[Dict[str, List[Dict]],
 from datetime import timedelta
 
 _SMURFING_WINDOW = timedelta(hours=72)
+_SMURFING_WINDOW_US = _SMURFING_WINDOW // timedelta(microseconds=1)
 _SMURFING_MIN_COUNTERPARTIES = 10
 _MERCHANT_TX_THRESHOLD = 100
 
@@ -495,70 +1474,240 @@ def is_merchant(
     return (incoming_count + outgoing_count) > _MERCHANT_TX_THRESHOLD
 
 
-def _parse_ts(ts) -> datetime:
-    """Parse a timestamp that may be a datetime or an ISO-format string."""
-    if isinstance(ts, datetime):
-        return ts
-    return datetime.fromisoformat(ts)
+def account_tx_counts(
+    incoming_map: Dict[str, List[Dict]],
+    outgoing_map: Dict[str, List[Dict]],
+) -> Dict[str, int]:
+    """
+    Total transaction count (incoming + outgoing) for every account, i.e.
+    ``total_degree`` for all accounts at once.
+    """
+    counts = {account: len(txns) for account, txns in incoming_map.items()}
+    for account, txns in outgoing_map.items():
+        counts[account] = counts.get(account, 0) + len(txns)
+    return counts
+
+
+def merchant_accounts(
+    incoming_map: Dict[str, List[Dict]],
+    outgoing_map: Dict[str, List[Dict]],
+) -> frozenset[str]:
+    """Every account ``is_merchant`` would flag, computed in one pass."""
+    return frozenset(
+        account
+        for account, count in account_tx_counts(incoming_map, outgoing_map).items()
+        if count > _MERCHANT_TX_THRESHOLD
+    )
+
+
+def _timestamps_us(txn_lists: List[List[Dict]]) -> List[List[int]]:
+    """
+    Epoch-microsecond timestamps (UTC; naive taken as UTC) for several
+    transaction lists, parsed in a single vectorised call. Timestamps may be
+    datetimes or ISO-format strings.
+    """
+    flat = [tx["timestamp"] for txns in txn_lists for tx in txns]
+    us = pd.to_datetime(flat, utc=True, format='ISO8601').as_unit('us').asi8.tolist()
+    result: List[List[int]] = []
+    start = 0
+    for txns in txn_lists:
+        result.append(us[start:start + len(txns)])
+        start += len(txns)
+    return result
+
+
+def _best_window(
+    ts: List[int],
+    parties: List[int],
+    window_us: int,
+    counts: List[int],
+) -> tuple[int, int, int]:
+    """
+    Sliding-window scan over one account's time-ordered transactions.
+
+    ``parties`` are small-int counterparty codes and ``counts`` a zeroed
+    counter with a slot per code; it is left zeroed again on return, so one
+    buffer serves every account.
+
+    Returns ``(best_unique, best_left, best_right)``: the largest number of
+    distinct counterparties seen within ``window_us`` and the first window
+    (inclusive positions) that reaches it.
+    """
+    unique = 0
+    left = 0
+    best_unique = 0
+    best_left = 0
+    best_right = 0
+
+    for right in range(len(parties)):
+        party = parties[right]
+        if counts[party] == 0:
+            unique += 1
+        counts[party] += 1
+
+        # Shrink the window from the left while it exceeds the limit
+        while ts[right] - ts[left] > window_us:
+            old_party = parties[left]
+            counts[old_party] -= 1
+            if counts[old_party] == 0:
+                unique -= 1
+            left += 1
+
+        if unique > best_unique:
+            best_unique = unique
+            best_left = left
+            best_right = right
+
+    # Only the final window's slots are still set
+    for i in range(left, len(parties)):
+        counts[parties[i]] = 0
+
+    return best_unique, best_left, best_right
+
+
+def _best_windows(
+    ts_per_account: List[List[int]],
+    codes_per_account: List[List[int]],
+    n_codes: int,
+    window_us: int,
+) -> List[tuple[int, int, int]]:
+    """``_best_window`` for each account's timestamps and counterparty codes."""
+    counts = [0] * n_codes  # one zeroed buffer shared by every scan
+    return [
+        _best_window(ts, codes, window_us, counts)
+        for ts, codes in zip(ts_per_account, codes_per_account)
+    ]
+
+
+def _may_fill_window(view: AccountTxns, count: int, window_us: int) -> List[bool]:
+    """
+    For each account in ``view``: whether ``count`` consecutive transactions
+    ever fall within ``window_us`` of each other.
+
+    A window holds no more distinct counterparties than transactions, so an
+    account that is False here can never reach ``count`` in ``_best_window``.
+    Accounts whose rows are not in chronological order are always True.
+    """
+    ts = view.ts_us
+    seg = np.repeat(np.arange(len(view.accounts)), np.diff(view.indptr))
+    possible = np.zeros(len(view.accounts), dtype=bool)
+    span = count - 1
+    if len(ts) > span:
+        # Row i and row i + span in the same account, close enough together
+        hits = (seg[span:] == seg[:-span]) & (ts[span:] - ts[:-span] <= window_us)
+        possible[seg[span:][hits]] = True
+    # Rows follow the serialised timestamp, which with mixed UTC offsets
+    # need not be chronological; the bound does not hold for those accounts
+    backwards = (np.diff(ts) < 0) & (seg[1:] == seg[:-1])
+    possible[seg[1:][backwards]] = True
+    return possible.tolist()
+
+
+def _counterparty_codes(
+    txn_lists: List[List[Dict]],
+    key: str,
+) -> tuple[List[List[str]], List[List[int]], int]:
+    """
+    Counterparty ids for several transaction lists, plus the same ids
+    factorised to contiguous ints across all lists. Returns
+    ``(ids_per_list, codes_per_list, number_of_codes)``.
+    """
+    ids = [[tx[key] for tx in txns] for txns in txn_lists]
+    flat = [party for parties in ids for party in parties]
+    codes, uniques = pd.factorize(_object_array(flat))
+    codes = codes.tolist()
+    codes_per_list: List[List[int]] = []
+    start = 0
+    for parties in ids:
+        codes_per_list.append(codes[start:start + len(parties)])
+        start += len(parties)
+    return ids, codes_per_list, len(uniques)
+
+
+def _scan_inputs(
+    txn_map: Dict[str, List[Dict]],
+    accounts: List[str],
+    key: str,
+    view: Optional[AccountTxns],
+) -> tuple[List[List[int]], List[List[str]], List[List[int]], int]:
+    """
+    Timestamps, counterparty ids and counterparty codes for each account's
+    transactions, as ``(ts_per_account, ids_per_account, codes_per_account,
+    number_of_codes)``. With a structure-of-arrays ``view`` the columns are
+    sliced directly; otherwise they are collected from the map's dicts.
+    """
+    if view is None:
+        txn_lists = [txn_map[account] for account in accounts]
+        return (_timestamps_us(txn_lists), *_counterparty_codes(txn_lists, key))
+
+    position = view.position
+    bounds = view.indptr.tolist()
+    spans = [(bounds[position[a]], bounds[position[a] + 1]) for a in accounts]
+    rows = np.concatenate(
+        [np.arange(lo, hi) for lo, hi in spans] or [np.empty(0, dtype=np.int64)]
+    )
+    ts = view.ts_us[rows].tolist()
+    peers = view.peer[rows]
+    codes, uniques = pd.factorize(peers)
+    ids = peers.tolist()
+    codes = codes.tolist()
+
+    ts_per, ids_per, codes_per = [], [], []
+    start = 0
+    for lo, hi in spans:
+        end = start + hi - lo
+        ts_per.append(ts[start:end])
+        ids_per.append(ids[start:end])
+        codes_per.append(codes[start:end])
+        start = end
+    return ts_per, ids_per, codes_per, len(uniques)
 
 
 def detect_fan_in(
     incoming_map: Dict[str, List[Dict]],
     outgoing_map: Dict[str, List[Dict]],
+    merchant_ids: Optional[frozenset[str]] = None,
+    incoming: Optional[AccountTxns] = None,
 ) -> List[Dict[str, Any]]:
     """
     Detect fan-in smurfing: 10+ unique senders sending to the SAME
     receiver within a sliding 72-hour window.
 
+    ``merchant_ids`` may be passed in precomputed (see ``merchant_accounts``),
+    and ``incoming`` as the map's columnar view (see ``account_txns``).
+
     Returns a list of ring dicts (without ring_id; those are assigned
     later by smurfing_detector).
     """
     rings: List[Dict[str, Any]] = []
     seen_accounts: set[str] = set()
+    if merchant_ids is None:
+        merchant_ids = merchant_accounts(incoming_map, outgoing_map)
+
+    candidates = [
+        receiver_id
+        for receiver_id in sorted(incoming_map.keys())  # sorted for determinism
+        if len(incoming_map[receiver_id]) >= _SMURFING_MIN_COUNTERPARTIES  # fast path
+        and receiver_id not in merchant_ids
+    ]
+    if incoming is not None:
+        # Skip accounts that never see enough transactions in one window
+        possible = _may_fill_window(incoming, _SMURFING_MIN_COUNTERPARTIES, _SMURFING_WINDOW_US)
+        candidates = [r for r in candidates if possible[incoming.position[r]]]
+    # Gather every candidate's timestamps and code every sender in one go
+    candidate_ts, candidate_senders, candidate_codes, n_codes = _scan_inputs(
+        incoming_map, candidates, "sender_id", incoming
+    )
+    windows = _best_windows(candidate_ts, candidate_codes, n_codes, _SMURFING_WINDOW_US)
 
-    for receiver_id in sorted(incoming_map.keys()):  # sorted for determinism
+    for receiver_id, senders, (best_unique, best_left, best_right) in zip(
+        candidates, candidate_senders, windows
+    ):
         if receiver_id in seen_accounts:
             continue
-        if is_merchant(receiver_id, incoming_map, outgoing_map):
-            continue
-
-        txns = incoming_map[receiver_id]
-        if len(txns) < _SMURFING_MIN_COUNTERPARTIES:
-            continue  # fast path – not enough txns at all
-
-        # Parse timestamps once
-        parsed: List[tuple[datetime, str]] = [
-            (_parse_ts(tx["timestamp"]), tx["sender_id"]) for tx in txns
-        ]
-
-        # Sliding-window with a sender frequency counter
-        sender_freq: Dict[str, int] = {}
-        left = 0
-        best_unique = 0
-        best_left = 0
-        best_right = 0
-
-        for right in range(len(parsed)):
-            sender = parsed[right][1]
-            sender_freq[sender] = sender_freq.get(sender, 0) + 1
-
-            # Shrink the window from the left while it exceeds 72 h
-            while parsed[right][0] - parsed[left][0] > _SMURFING_WINDOW:
-                old_sender = parsed[left][1]
-                sender_freq[old_sender] -= 1
-                if sender_freq[old_sender] == 0:
-                    del sender_freq[old_sender]
-                left += 1
-
-            if len(sender_freq) > best_unique:
-                best_unique = len(sender_freq)
-                best_left = left
-                best_right = right
 
         if best_unique >= _SMURFING_MIN_COUNTERPARTIES:
-            senders_in_window = {
-                parsed[i][1] for i in range(best_left, best_right + 1)
-            }
+            senders_in_window = set(senders[best_left:best_right + 1])
             members = sorted(senders_in_window | {receiver_id})
             seen_accounts.add(receiver_id)
             rings.append({
@@ -572,6 +1721,8 @@ def detect_fan_in(
 def detect_fan_out(
     outgoing_map: Dict[str, List[Dict]],
     incoming_map: Dict[str, List[Dict]],
+    merchant_ids: Optional[frozenset[str]] = None,
+    outgoing: Optional[AccountTxns] = None,
 ) -> List[Dict[str, Any]]:
     """
     Detect fan-out smurfing: 1 sender sending to 10+ unique receivers
@@ -581,47 +1732,31 @@ def detect_fan_out(
     """
     rings: List[Dict[str, Any]] = []
     seen_accounts: set[str] = set()
+    if merchant_ids is None:
+        merchant_ids = merchant_accounts(incoming_map, outgoing_map)
+
+    candidates = [
+        sender_id
+        for sender_id in sorted(outgoing_map.keys())  # sorted for determinism
+        if len(outgoing_map[sender_id]) >= _SMURFING_MIN_COUNTERPARTIES
+        and sender_id not in merchant_ids
+    ]
+    if outgoing is not None:
+        possible = _may_fill_window(outgoing, _SMURFING_MIN_COUNTERPARTIES, _SMURFING_WINDOW_US)
+        candidates = [s for s in candidates if possible[outgoing.position[s]]]
+    candidate_ts, candidate_receivers, candidate_codes, n_codes = _scan_inputs(
+        outgoing_map, candidates, "receiver_id", outgoing
+    )
+    windows = _best_windows(candidate_ts, candidate_codes, n_codes, _SMURFING_WINDOW_US)
 
-    for sender_id in sorted(outgoing_map.keys()):  # sorted for determinism
+    for sender_id, receivers, (best_unique, best_left, best_right) in zip(
+        candidates, candidate_receivers, windows
+    ):
         if sender_id in seen_accounts:
             continue
-        if is_merchant(sender_id, incoming_map, outgoing_map):
-            continue
-
-        txns = outgoing_map[sender_id]
-        if len(txns) < _SMURFING_MIN_COUNTERPARTIES:
-            continue
-
-        parsed: List[tuple[datetime, str]] = [
-            (_parse_ts(tx["timestamp"]), tx["receiver_id"]) for tx in txns
-        ]
-
-        receiver_freq: Dict[str, int] = {}
-        left = 0
-        best_unique = 0
-        best_left = 0
-        best_right = 0
-
-        for right in range(len(parsed)):
-            receiver = parsed[right][1]
-            receiver_freq[receiver] = receiver_freq.get(receiver, 0) + 1
-
-            while parsed[right][0] - parsed[left][0] > _SMURFING_WINDOW:
-                old_recv = parsed[left][1]
-                receiver_freq[old_recv] -= 1
-                if receiver_freq[old_recv] == 0:
-                    del receiver_freq[old_recv]
-                left += 1
-
-            if len(receiver_freq) > best_unique:
-                best_unique = len(receiver_freq)
-                best_left = left
-                best_right = right
 
         if best_unique >= _SMURFING_MIN_COUNTERPARTIES:
-            receivers_in_window = {
-                parsed[i][1] for i in range(best_left, best_right + 1)
-            }
+            receivers_in_window = set(receivers[best_left:best_right + 1])
             members = sorted(receivers_in_window | {sender_id})
             seen_accounts.add(sender_id)
             rings.append({
@@ -635,20 +1770,27 @@ def detect_fan_out(
 def smurfing_detector(
     incoming_map: Dict[str, List[Dict]],
     outgoing_map: Dict[str, List[Dict]],
+    G: Optional[nx.MultiDiGraph] = None,
 ) -> List[SuspiciousRing]:
     """
     Top-level smurfing detector.  Combines fan-in and fan-out results
     and assigns deterministic ring IDs (RING_SM_001, RING_SM_002, …).
+
+    Passing the graph the maps were built from lets the window scans read
+    its columnar views instead of the maps' per-transaction dicts.
     """
-    fan_in_rings = detect_fan_in(incoming_map, outgoing_map)
-    fan_out_rings = detect_fan_out(outgoing_map, incoming_map)
+    views = account_txns(G) if G is not None else None
+    outgoing, incoming = views if views is not None else (None, None)
+    merchant_ids = merchant_accounts(incoming_map, outgoing_map)
+    fan_in_rings = detect_fan_in(incoming_map, outgoing_map, merchant_ids, incoming)
+    fan_out_rings = detect_fan_out(outgoing_map, incoming_map, merchant_ids, outgoing)
 
     all_raw = fan_in_rings + fan_out_rings
 
     results: List[SuspiciousRing] = []
     for idx, raw in enumerate(all_raw, start=1):
         results.append(
-            SuspiciousRing(
+            _new_ring(
                 ring_id=f"RING_SM_{idx:03}",
                 members=raw["members"],
                 pattern=raw["pattern"],
@@ -684,10 +1826,28 @@ def to_simple_digraph(G: nx.MultiDiGraph) -> nx.DiGraph:
     Convert a MultiDiGraph to a simple DiGraph (one edge per (u, v) pair).
     The original graph is NOT modified.
     """
-    simple = nx.DiGraph()
-    for u, v in G.edges():
-        simple.add_edge(u, v)
-    return simple
+    return nx.DiGraph(_unique_edge_pairs(G))
+
+
+def sorted_csr_adjacency(G: nx.MultiDiGraph) -> tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Simple-graph adjacency in CSR form, built from the edge table.
+
+    Node ``i`` is the ``i``-th account id in sorted order; its distinct
+    successors are ``indices[indptr[i]:indptr[i + 1]]``, ascending (so also
+    in sorted-id order). Returns ``(names, indptr, indices)``.
+    """
+    table = edge_table(G)
+    n = len(table.nodes)
+    order = table.sorted_order
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n, dtype=np.int64)
+
+    pairs = np.unique(rank[table.src] * n + rank[table.dst])
+    src = pairs // max(n, 1)
+    indices = pairs - src * n
+    indptr = np.searchsorted(src, np.arange(n + 1, dtype=np.int64))
+    return table.nodes[order].tolist(), indptr, indices
 
 
 def detect_layered_networks(
@@ -705,87 +1865,95 @@ def detect_layered_networks(
 
     Returns a deduplicated, deterministically ordered list of SuspiciousRing.
     """
-    simple = to_simple_digraph(G)
-
-    # Pre-compute degrees and merchant status for every node so we avoid
-    # repeated dict lookups during the DFS.
-    node_degree: Dict[str, int] = {}
-    node_is_merchant: Dict[str, bool] = {}
-    for node in simple.nodes():
-        node_degree[node] = total_degree(node, incoming_map, outgoing_map)
-        node_is_merchant[node] = is_merchant(node, incoming_map, outgoing_map)
+    # The DFS runs on int node indices (sorted-id order) over CSR adjacency.
+    names, indptr, indices = sorted_csr_adjacency(G)
+    tx_counts = account_tx_counts(incoming_map, outgoing_map)
 
     def _valid_intermediate(node: str) -> bool:
         """Check if a node qualifies as a valid intermediate in a layered path."""
-        deg = node_degree[node]
+        deg = tx_counts.get(node, 0)  # total_degree; also the merchant measure
         return (
             _LAYERED_INTERMEDIATE_MIN_DEGREE <= deg <= _LAYERED_INTERMEDIATE_MAX_DEGREE
-            and not node_is_merchant[node]
+            and deg <= _MERCHANT_TX_THRESHOLD
+        )
+
+    # Per-node successor tuples (CSR slices) and intermediate validity,
+    # computed once instead of on every visit.
+    indices_list = indices.tolist()
+    bounds = indptr.tolist()
+    successors: List[tuple] = [
+        tuple(indices_list[bounds[i]:bounds[i + 1]]) for i in range(len(names))
+    ]
+    valid: List[bool] = [_valid_intermediate(node) for node in names]
+    # Random 128-bit key per node (fixed seed). A path's member set is keyed
+    # by XOR-ing its nodes' keys, kept up to date as the path grows, so
+    # dedup compares ints instead of building a frozenset per path.
+    rng = random.Random(0)
+    node_keys: List[int] = [rng.getrandbits(128) for _ in range(len(names))]
+
+    @lru_cache(maxsize=None)
+    def _can_reach_min_length(node: int, remaining: int) -> bool:
+        """
+        Whether a walk of ``remaining`` more edges can leave ``node`` through
+        valid intermediates (the last hop may land anywhere). Ignores the
+        simple-path constraint, so False is a safe reason to prune.
+        """
+        if remaining <= 0:
+            return True
+        if remaining == 1:
+            return bool(successors[node])
+        return any(
+            valid[succ] and _can_reach_min_length(succ, remaining - 1)
+            for succ in successors[node]
         )
 
     # Collect all valid paths using bounded DFS.
     # A path with `k` edges has `k + 1` nodes.
     # Path lengths of interest: 3..5 edges → 4..6 nodes.
-    seen_member_sets: set[frozenset[str]] = set()
+    # Every node pushed as an intermediate already qualifies, so any path
+    # that reaches the minimum length is a layered chain.
+    seen_member_sets: set[int] = set()
     raw_rings: List[Dict[str, Any]] = []
 
     # Iterate over all potential start nodes in sorted order (determinism).
-    for start in sorted(simple.nodes()):
-        # Bounded DFS – stack entries: (current_node, path_so_far)
-        stack: list[tuple[str, list[str]]] = [(start, [start])]
+    for start in range(len(names)):
+        if not _can_reach_min_length(start, _LAYERED_MIN_PATH_LEN):
+            continue
+
+        # Bounded DFS – stack entries: (current_node, path_so_far, member_key)
+        stack: list[tuple[int, tuple, int]] = [(start, (start,), node_keys[start])]
 
         while stack:
-            current, path = stack.pop()
+            current, path, member_key = stack.pop()
             edge_count = len(path) - 1  # number of edges traversed so far
 
-            # If we already have a path in the valid edge-count range,
-            # record it (but continue extending if we haven't hit max).
-            if _LAYERED_MIN_PATH_LEN <= edge_count <= _LAYERED_MAX_PATH_LEN:
-                # Validate all intermediate nodes (indices 1 .. len-2)
-                intermediates_ok = all(
-                    _valid_intermediate(path[i]) for i in range(1, len(path) - 1)
-                )
-                if intermediates_ok:
-                    member_key = frozenset(path)
-                    if member_key not in seen_member_sets:
-                        seen_member_sets.add(member_key)
-                        raw_rings.append({
-                            "members": list(path),  # preserve traversal order
-                            "pattern": "layered",
-                        })
-
-            # Stop extending if we've hit the maximum edge count.
-            if edge_count >= _LAYERED_MAX_PATH_LEN:
-                continue
-
-            # Before extending, check that the NEXT node would be a valid
-            # intermediate (unless it would become the end node of a valid-
-            # length path, in which case it doesn't need the intermediate
-            # check).  We still need to ensure the path stays simple.
-            for neighbor in sorted(simple.successors(current)):
-                if neighbor in path:  # simple path – no repeated nodes
+            if edge_count >= _LAYERED_MIN_PATH_LEN:
+                if member_key not in seen_member_sets:
+                    seen_member_sets.add(member_key)
+                    raw_rings.append({
+                        "members": [names[i] for i in path],  # preserve traversal order
+                        "pattern": "layered",
+                    })
+
+                # Stop at the maximum length, or when the end node could
+                # not serve as an intermediate of a longer chain.
+                if edge_count >= _LAYERED_MAX_PATH_LEN or not valid[current]:
                     continue
 
-                next_edge_count = edge_count + 1
-
-                # If this neighbor would be an intermediate (i.e., we could
-                # extend further), it must pass the intermediate check.
-                # If next_edge_count is already in valid range, the neighbor
-                # is the *end* node and doesn't need the check – but we
-                # still want to try extending further, so we allow it.
-                is_end_candidate = next_edge_count >= _LAYERED_MIN_PATH_LEN
-                is_extendable = next_edge_count < _LAYERED_MAX_PATH_LEN
+            next_edge_count = edge_count + 1
+            for neighbor in successors[current]:
+                if neighbor in path:  # simple path – no repeated nodes
+                    continue
 
-                if is_extendable and not is_end_candidate:
-                    # neighbor will definitely be intermediate – must qualify
-                    if not _valid_intermediate(neighbor):
-                        continue
-                elif is_extendable and is_end_candidate:
-                    # neighbor could be end OR intermediate; allow either way
-                    pass
-                # else: next_edge_count == MAX, neighbor is the final end node
+                # A neighbor reached before the minimum length will be an
+                # intermediate: it must qualify and be able to finish a chain.
+                if next_edge_count < _LAYERED_MIN_PATH_LEN and not (
+                    valid[neighbor]
+                    and _can_reach_min_length(neighbor, _LAYERED_MIN_PATH_LEN - next_edge_count)
+                ):
+                    continue
 
-                stack.append((neighbor, path + [neighbor]))
+                stack.append((neighbor, path + (neighbor,), member_key ^ node_keys[neighbor]))
 
     # Sort raw rings deterministically by sorted member tuple for stable IDs.
     raw_rings.sort(key=lambda r: tuple(sorted(r["members"])))
@@ -794,7 +1962,7 @@ def detect_layered_networks(
     results: List[SuspiciousRing] = []
     for idx, ring in enumerate(raw_rings, start=1):
         results.append(
-            SuspiciousRing(
+            _new_ring(
                 ring_id=f"RING_LY_{idx:03}",
                 members=sorted(ring["members"]),
                 pattern=ring["pattern"],
@@ -847,7 +2015,7 @@ def assign_risk_scores(rings: List[SuspiciousRing]) -> List[SuspiciousRing]:
     scored: List[SuspiciousRing] = []
     for ring in rings:
         scored.append(
-            SuspiciousRing(
+            _new_ring(
                 ring_id=ring.ring_id,
                 members=ring.members,
                 pattern=ring.pattern,
@@ -874,7 +2042,7 @@ def assign_ring_ids(rings: List[SuspiciousRing]) -> List[SuspiciousRing]:
     result: List[SuspiciousRing] = []
     for idx, ring in enumerate(rings, start=1):
         result.append(
-            SuspiciousRing(
+            _new_ring(
                 ring_id=f"RING_{idx:03}",
                 members=ring.members,
                 pattern=ring.pattern,
@@ -900,12 +2068,22 @@ def aggregate_fraud_rings(
     4. Assign deterministic sequential ring IDs
 
     Returns a final, deterministic list of SuspiciousRing objects.
+
+    Equivalent to ``assign_ring_ids(sort_rings_by_risk(assign_risk_scores(...)))``
+    but scores and sorts plain values first, then copies each ring once
+    with its final score and ID. Input rings are not mutated.
     """
     combined = combine_all_rings(cycle_rings, smurfing_rings, layered_rings)
-    scored = assign_risk_scores(combined)
-    ordered = sort_rings_by_risk(scored)
-    final = assign_ring_ids(ordered)
-    return final
+    scores = [
+        calculate_aggregated_risk_score(ring.pattern, len(ring.members))
+        for ring in combined
+    ]
+    # Stable descending sort, as in sort_rings_by_risk
+    order = sorted(range(len(combined)), key=scores.__getitem__, reverse=True)
+    return [
+        combined[i].model_copy(update={"ring_id": f"RING_{idx:03}", "risk_score": scores[i]})
+        for idx, i in enumerate(order, start=1)
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -923,6 +2101,7 @@ _VELOCITY_BONUS_HIGH = 20   # > 10 tx/hour
 _VELOCITY_BONUS_LOW = 10    # > 5  tx/hour
 _MERCHANT_PENALTY = -50
 _SCORING_MERCHANT_TX_THRESHOLD = 200
+_ONE_HOUR_US = 3_600_000_000  # velocity window
 
 
 class SuspiciousAccount(BaseModel):
@@ -954,14 +2133,14 @@ def build_account_ring_map(
     Returns:
         Dict mapping each account to its list of ring IDs (sorted for determinism).
     """
-    account_to_rings: Dict[str, List[str]] = {}
+    account_to_rings: Dict[str, List[str]] = defaultdict(list)
     for ring in fraud_rings:
         for member in ring.members:
-            account_to_rings.setdefault(member, []).append(ring.ring_id)
+            account_to_rings[member].append(ring.ring_id)
     # Sort ring lists for determinism
     for acc in account_to_rings:
-        account_to_rings[acc] = sorted(account_to_rings[acc])
-    return account_to_rings
+        account_to_rings[acc].sort()
+    return dict(account_to_rings)
 
 
 def apply_ring_scores(
@@ -977,12 +2156,12 @@ def apply_ring_scores(
     Returns:
         Dict mapping account_id → cumulative pattern-based score.
     """
-    scores: Dict[str, int] = {}
+    scores: Dict[str, int] = defaultdict(int)
     for ring in fraud_rings:
         pattern_score = _PATTERN_SCORES.get(ring.pattern, 0)
         for member in ring.members:
-            scores[member] = scores.get(member, 0) + pattern_score
-    return scores
+            scores[member] += pattern_score
+    return dict(scores)
 
 
 def compute_transaction_metrics(
@@ -1003,55 +2182,47 @@ def compute_transaction_metrics(
     """
     metrics: Dict[str, Dict[str, Any]] = {}
 
-    # Gather timestamps per node (both sent and received count)
-    node_timestamps: Dict[str, List[datetime]] = {}
-    node_tx_count: Dict[str, int] = {}
-
-    for node in G.nodes():
-        node_tx_count[node] = 0
-        node_timestamps[node] = []
-
-    for u, v, data in G.edges(data=True):
-        ts = data.get("timestamp")
-        # sender activity
-        node_tx_count[u] = node_tx_count.get(u, 0) + 1
-        if ts is not None:
-            node_timestamps.setdefault(u, []).append(ts)
-        # receiver activity
-        node_tx_count[v] = node_tx_count.get(v, 0) + 1
-        if ts is not None:
-            node_timestamps.setdefault(v, []).append(ts)
+    # One row per edge endpoint: each edge counts for sender and receiver
+    table = edge_table(G)
+    node_count = len(table.nodes)
+    ends = np.concatenate((table.src, table.dst))
+    ts_us = np.concatenate((table.ts_us, table.ts_us))
+    node_tx_count = np.bincount(ends, minlength=node_count)
+
+    # Sliding window for max tx/hour, over edges that carry a timestamp.
+    # Rows are sorted by (node, timestamp rank) through one int64 key; each
+    # row's window starts at the node's first row within an hour before it.
+    dated = ts_us != np.iinfo(np.int64).min  # missing timestamps become NaT
+    distinct_ts, ts_rank = np.unique(ts_us[dated], return_inverse=True)
+    stride = len(distinct_ts) + 1
+    keys = np.sort(ends[dated] * stride + ts_rank)
+    key_nodes, key_ranks = np.divmod(keys, stride)
+    window_start_rank = np.searchsorted(
+        distinct_ts, distinct_ts[key_ranks] - _ONE_HOUR_US, side='left'
+    )
+    left = np.searchsorted(keys, key_nodes * stride + window_start_rank, side='left')
+    max_tx_per_hour = np.zeros(node_count, dtype=np.int64)
+    np.maximum.at(max_tx_per_hour, key_nodes, np.arange(len(keys)) - left + 1)
 
     # Average degree for merchant heuristic
     total_nodes = G.number_of_nodes()
-    avg_tx = (sum(node_tx_count.values()) / total_nodes) if total_nodes > 0 else 0.0
+    avg_tx = (int(node_tx_count.sum()) / total_nodes) if total_nodes > 0 else 0.0
     high_degree_threshold = avg_tx * 3  # 3× the average is "very high"
 
-    one_hour = timedelta(hours=1)
-
-    for node in sorted(G.nodes()):  # sorted for determinism
-        total_tx = node_tx_count.get(node, 0)
-        timestamps = sorted(node_timestamps.get(node, []))
-
-        # Sliding-window for max tx/hour
-        max_tx_per_hour = 0
-        if timestamps:
-            left = 0
-            for right in range(len(timestamps)):
-                while timestamps[right] - timestamps[left] > one_hour:
-                    left += 1
-                window_size = right - left + 1
-                if window_size > max_tx_per_hour:
-                    max_tx_per_hour = window_size
+    names = table.nodes.tolist()
+    tx_counts = node_tx_count.tolist()
+    max_per_hour = max_tx_per_hour.tolist()
+    for i in table.sorted_order.tolist():  # sorted for determinism
+        total_tx = tx_counts[i]
 
         is_merchant_node = (
             total_tx > _SCORING_MERCHANT_TX_THRESHOLD
             or total_tx > high_degree_threshold
         )
 
-        metrics[node] = {
+        metrics[names[i]] = {
             "total_transactions": total_tx,
-            "max_tx_per_hour": max_tx_per_hour,
+            "max_tx_per_hour": max_per_hour[i],
             "is_merchant": is_merchant_node,
         }
 
@@ -1070,23 +2241,24 @@ def apply_velocity_bonus(
       > 5  tx/hour  → +10
 
     Args:
-        scores: Current account scores (mutated in-place copy is fine).
+        scores: Current account scores (updated in place).
         metrics: Per-node transaction metrics.
 
     Returns:
-        Updated scores dict.
+        The same ``scores`` dict, updated.
     """
-    updated = dict(scores)
-    for account, m in metrics.items():
+    # Only scored accounts can get a bonus, so walk those rather than
+    # every node in ``metrics``
+    for account in scores:
+        m = metrics.get(account)
+        if m is None:
+            continue
         rate = m["max_tx_per_hour"]
-        bonus = 0
         if rate > 10:
-            bonus = _VELOCITY_BONUS_HIGH
+            scores[account] += _VELOCITY_BONUS_HIGH
         elif rate > 5:
-            bonus = _VELOCITY_BONUS_LOW
-        if bonus and account in updated:
-            updated[account] += bonus
-    return updated
+            scores[account] += _VELOCITY_BONUS_LOW
+    return scores
 
 
 def apply_merchant_penalty(
@@ -1097,23 +2269,23 @@ def apply_merchant_penalty(
     Subtract merchant penalty from merchant-like accounts.
 
     Args:
-        scores: Current account scores.
+        scores: Current account scores (updated in place).
         metrics: Per-node transaction metrics.
 
     Returns:
-        Updated scores dict.
+        The same ``scores`` dict, updated.
     """
-    updated = dict(scores)
-    for account in updated:
+    for account in scores:
         if metrics.get(account, {}).get("is_merchant", False):
-            updated[account] += _MERCHANT_PENALTY  # negative value
-    return updated
+            scores[account] += _MERCHANT_PENALTY  # negative value
+    return scores
 
 
 def build_final_account_list(
     scores: Dict[str, int],
     account_to_rings: Dict[str, List[str]],
     metrics: Optional[Dict[str, Dict[str, Any]]] = None,
+    top_k: Optional[int] = None,
 ) -> List[SuspiciousAccount]:
     """
     Build the final sorted list of suspicious accounts.
@@ -1121,101 +2293,116 @@ def build_final_account_list(
     * Scores are clamped to [0, 100] and cast to int.
     * Sorted by suspicion_score DESC, then account_id ASC (tie-break).
     * Only accounts that appear in at least one ring are included.
+    * With ``top_k``, only the first ``top_k`` accounts of that order are
+      kept; the others are never built.
 
     Args:
         scores: Final computed scores.
         account_to_rings: Mapping of account → ring IDs.
         metrics: Per-node transaction metrics (for merchant flag).
+        top_k: Optional cap on the number of accounts returned.
 
     Returns:
         Sorted list of SuspiciousAccount objects.
     """
+    # Rank (score, account_id) pairs first, so accounts cut by top_k are
+    # never turned into models
+    ranked = [
+        (int(max(0, min(100, scores.get(account_id, 0)))), account_id)
+        for account_id in account_to_rings
+    ]
+    # Primary: score DESC, secondary: account_id ASC (determinism)
+    if top_k is None:
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+    else:
+        ranked = heapq.nsmallest(top_k, ranked, key=lambda item: (-item[0], item[1]))
+
     result: List[SuspiciousAccount] = []
-    for account_id in account_to_rings:
-        raw_score = scores.get(account_id, 0)
-        clamped = max(0, min(100, raw_score))
+    for clamped, account_id in ranked:
         is_merchant = (
             metrics.get(account_id, {}).get("is_merchant", False)
             if metrics else False
         )
         result.append(
-            SuspiciousAccount(
+            SuspiciousAccount.model_construct(
                 account_id=account_id,
-                suspicion_score=int(clamped),
+                suspicion_score=clamped,
                 involved_rings=sorted(account_to_rings[account_id]),
-                is_merchant=is_merchant,
+                is_merchant=bool(is_merchant),
             )
         )
-    # Primary: score DESC, secondary: account_id ASC (determinism)
-    result.sort(key=lambda a: (-a.suspicion_score, a.account_id))
     return result
 
 
 def _extract_pipeline_features(
     G: nx.MultiDiGraph,
     fraud_rings: List[SuspiciousRing],
+    metrics: Optional[Dict[str, Dict[str, Any]]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Extract per-account features from the pipeline graph and fraud rings,
     formatted for the ML predictor.
 
+    ``metrics`` may be passed in when already computed for ``G``.
+
     Returns a list of feature dicts (one per account) with keys matching
     the training schema.
     """
-    metrics = compute_transaction_metrics(G)
+    if metrics is None:
+        metrics = compute_transaction_metrics(G)
 
     # Derive pattern-level flags from fraud rings
     smurfing_accounts: set[str] = set()
-    cycle_accounts: Dict[str, int] = {}      # account → cycle count
-    layering_accounts: Dict[str, int] = {}    # account → depth estimate
-    ring_members: Dict[str, int] = {}         # account → largest ring size
+    cycle_accounts: Counter[str] = Counter()             # account → cycle count
+    layering_accounts: Dict[str, int] = defaultdict(int)  # account → depth estimate
+    ring_members: Dict[str, int] = defaultdict(int)       # account → largest ring size
 
     for ring in fraud_rings:
         members = ring.members
         size = len(members)
         for m in members:
-            ring_members[m] = max(ring_members.get(m, 0), size)
+            if size > ring_members[m]:
+                ring_members[m] = size
 
         if ring.pattern == "cycle":
-            for m in members:
-                cycle_accounts[m] = cycle_accounts.get(m, 0) + 1
+            cycle_accounts.update(members)
         elif ring.pattern in ("smurfing_fan_in", "smurfing_fan_out"):
-            for m in members:
-                smurfing_accounts.add(m)
+            smurfing_accounts.update(members)
         elif ring.pattern == "layered":
             depth = len(members) - 1
             for m in members:
-                layering_accounts[m] = max(layering_accounts.get(m, 0), depth)
-
-    # Compute total_amount_sent and avg per node
-    sent_stats: Dict[str, Dict[str, float]] = {}
-    for u, v, data in G.edges(data=True):
-        s = sent_stats.setdefault(u, {"total": 0.0, "count": 0})
-        s["total"] += data.get("amount", 0.0)
-        s["count"] += 1
-
-    # Unique receivers / senders per node
-    unique_receivers: Dict[str, set] = {}
-    unique_senders: Dict[str, set] = {}
-    for u, v, _data in G.edges(data=True):
-        unique_receivers.setdefault(u, set()).add(v)
-        unique_senders.setdefault(v, set()).add(u)
-
+                if depth > layering_accounts[m]:
+                    layering_accounts[m] = depth
+
+    # Per-node sent totals and distinct counterparties, all from one pass
+    # over the edge table. Amounts are summed in G.edges() order.
+    table = edge_table(G)
+    node_count = len(table.nodes)
+    src = table.src[table.edge_order]
+    sent_total = np.bincount(
+        src, weights=table.amount[table.edge_order], minlength=node_count
+    ).tolist()
+    sent_count = np.bincount(src, minlength=node_count).tolist()
+    pairs = np.unique(table.src * max(node_count, 1) + table.dst)
+    pair_src, pair_dst = np.divmod(pairs, max(node_count, 1))
+    unique_receivers = np.bincount(pair_src, minlength=node_count).tolist()
+    unique_senders = np.bincount(pair_dst, minlength=node_count).tolist()
+
+    names = table.nodes.tolist()
     features: List[Dict[str, Any]] = []
-    for node in sorted(G.nodes()):
+    for i in table.sorted_order.tolist():
+        node = names[i]
         m = metrics.get(node, {})
-        s = sent_stats.get(node, {"total": 0.0, "count": 0})
-        total_sent = s["total"]
-        sent_count = s["count"]
-        avg_amount = (total_sent / sent_count) if sent_count > 0 else 0.0
+        total_sent = sent_total[i]
+        avg_amount = (total_sent / sent_count[i]) if sent_count[i] > 0 else 0.0
 
         features.append({
             "account_id": node,
             "total_transactions": m.get("total_transactions", 0),
             "total_amount_sent": round(total_sent, 2),
             "avg_transaction_amount": round(avg_amount, 2),
-            "unique_receivers": len(unique_receivers.get(node, set())),
-            "unique_senders": len(unique_senders.get(node, set())),
+            "unique_receivers": unique_receivers[i],
+            "unique_senders": unique_senders[i],
             "max_transactions_per_hour": m.get("max_tx_per_hour", 0),
             "smurfing_flag": 1 if node in smurfing_accounts else 0,
             "layering_depth": layering_accounts.get(node, 0),
@@ -1229,6 +2416,8 @@ def _extract_pipeline_features(
 def compute_suspicion_scores(
     G: nx.MultiDiGraph,
     fraud_rings: List[SuspiciousRing],
+    metrics: Optional[Dict[str, Dict[str, Any]]] = None,
+    top_k: Optional[int] = None,
 ) -> tuple[List[SuspiciousAccount], Dict[str, bool]]:
     """
     Main entry point for the suspicion scoring engine.
@@ -1244,6 +2433,8 @@ def compute_suspicion_scores(
     Args:
         G: Transaction MultiDiGraph.
         fraud_rings: Aggregated fraud rings from all detectors.
+        metrics: Optional ``compute_transaction_metrics(G)``, if already computed.
+        top_k: Optional cap on the number of accounts returned (highest first).
 
     Returns:
         Tuple of (sorted SuspiciousAccount list, merchant_accounts map for all nodes).
@@ -1255,7 +2446,8 @@ def compute_suspicion_scores(
     scores = apply_ring_scores(fraud_rings)
 
     # Step 3 – transaction metrics (velocity, merchant detection)
-    metrics = compute_transaction_metrics(G)
+    if metrics is None:
+        metrics = compute_transaction_metrics(G)
 
     # Step 4 – velocity bonus
     scores = apply_velocity_bonus(scores, metrics)
@@ -1263,14 +2455,58 @@ def compute_suspicion_scores(
     # Step 5 – merchant penalty
     scores = apply_merchant_penalty(scores, metrics)
 
-    # Build merchant map for ALL nodes
+    # Build merchant map for ALL nodes, in account-id order
+    table = edge_table(G)
     merchant_map: Dict[str, bool] = {
         node: metrics.get(node, {}).get("is_merchant", False)
-        for node in sorted(G.nodes())
+        for node in table.nodes[table.sorted_order].tolist()
     }
 
     # Step 6 – build & sort output
-    return build_final_account_list(scores, account_to_rings, metrics), merchant_map
+    return build_final_account_list(scores, account_to_rings, metrics, top_k), merchant_map
+
+
+def _build_graph_response(
+    transactions: List[Transaction],
+    dataset: Optional["_AnalysisDataset"] = None,
+) -> GraphAnalysisResponse:
+    """
+    Build the graph for ``/build-graph`` and summarise it (or reuse the
+    graph and maps of ``dataset``, whose transactions these are).
+    """
+    if dataset is not None:
+        G = dataset.graph
+        outgoing_map, incoming_map = dataset.transaction_maps
+    else:
+        # Build the graph
+        G = build_transaction_graph(transactions)
+
+        # Create transaction maps
+        outgoing_map, incoming_map = create_transaction_maps(G)
+
+    # Calculate graph statistics
+    amounts = edge_amounts(G)
+    total_amount = sum(amounts)
+
+    graph_stats = {
+        "nodes": list(G.nodes()),
+        "unique_senders": len(outgoing_map),
+        "unique_receivers": len(incoming_map),
+        "total_amount": total_amount,
+        "average_amount": total_amount / len(amounts) if amounts else 0,
+        "density": nx.density(G),
+        "is_connected": is_weakly_connected(G),
+    }
+
+    return GraphAnalysisResponse(
+        success=True,
+        message=f"Successfully built graph with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges",
+        nodes_count=G.number_of_nodes(),
+        edges_count=G.number_of_edges(),
+        graph_stats=graph_stats,
+        outgoing_map=outgoing_map,
+        incoming_map=incoming_map
+    )
 
 
 @app.post("/build-graph", response_model=GraphAnalysisResponse)
@@ -1281,46 +2517,66 @@ async def build_graph(file: UploadFile = File(...)) -> GraphAnalysisResponse:
     This endpoint uploads a CSV file, validates the transactions, builds a NetworkX 
     MultiDiGraph, and returns graph statistics along with outgoing/incoming maps.
     """
-    # First validate the CSV using existing upload functionality
-    csv_response = await upload_csv(file)
-    
-    if not csv_response.success:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"CSV validation failed: {csv_response.message}"
-        )
+    # First validate the CSV (or reuse a recent upload of the same file)
+    dataset = await _uploaded_dataset(file)
     
     try:
-        # Build the graph
-        G = build_transaction_graph(csv_response.valid_transactions)
-        
-        # Create transaction maps
-        outgoing_map, incoming_map = create_transaction_maps(G)
-        
-        # Calculate graph statistics
-        graph_stats = {
-            "nodes": list(G.nodes()),
-            "unique_senders": len(outgoing_map),
-            "unique_receivers": len(incoming_map),
-            "total_amount": sum(data['amount'] for _, _, data in G.edges(data=True)),
-            "average_amount": sum(data['amount'] for _, _, data in G.edges(data=True)) / G.number_of_edges() if G.number_of_edges() > 0 else 0,
-            "density": nx.density(G),
-            "is_connected": nx.is_weakly_connected(G) if G.number_of_nodes() > 0 else False,
-        }
-        
-        return GraphAnalysisResponse(
-            success=True,
-            message=f"Successfully built graph with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges",
-            nodes_count=G.number_of_nodes(),
-            edges_count=G.number_of_edges(),
-            graph_stats=graph_stats,
-            outgoing_map=outgoing_map,
-            incoming_map=incoming_map
-        )
-        
+        return await _run_analysis(_build_graph_response, dataset)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Graph building error: {str(e)}")
 
+def _ring_detection_response(
+    transactions: List[Transaction],
+    dataset: Optional["_AnalysisDataset"] = None,
+) -> RingDetectionResponse:
+    """Run every ring detector for ``/detect-rings`` (or reuse ``dataset``'s rings)."""
+    if dataset is not None:
+        G = dataset.graph
+        suspicious_rings = dataset.fraud_rings
+    else:
+        # Build the graph
+        G = build_transaction_graph(transactions)
+
+        # Detect rings from all three detectors
+        outgoing_map, incoming_map = create_transaction_maps(G)
+        cycle_rings = cycle_detector(G)
+        smurfing_rings = smurfing_detector(incoming_map, outgoing_map, G)
+        layered_rings = detect_layered_networks(G, incoming_map, outgoing_map)
+
+        # Aggregate: score, sort, and assign final IDs
+        suspicious_rings = aggregate_fraud_rings(cycle_rings, smurfing_rings, layered_rings)
+
+    # Calculate graph statistics
+    total_amount = sum(edge_amounts(G))
+    ring_sizes = Counter(len(r.members) for r in suspicious_rings)
+    ring_patterns = Counter(r.pattern for r in suspicious_rings)
+
+    graph_stats = {
+        "total_nodes": G.number_of_nodes(),
+        "total_edges": G.number_of_edges(),
+        "total_amount": total_amount,
+        "rings_by_size": {
+            "3_member_rings": ring_sizes[3],
+            "4_member_rings": ring_sizes[4],
+            "5_member_rings": ring_sizes[5]
+        },
+        "high_risk_rings": sum(1 for r in suspicious_rings if (r.risk_score or 0) > 0.7),
+        "total_ring_amount": sum(r.total_amount or 0 for r in suspicious_rings),
+        "cycle_rings": ring_patterns["cycle"],
+        "smurfing_fan_in": ring_patterns["smurfing_fan_in"],
+        "smurfing_fan_out": ring_patterns["smurfing_fan_out"],
+        "layered_networks": ring_patterns["layered"]
+    }
+
+    return RingDetectionResponse(
+        success=True,
+        message=f"Detected {len(suspicious_rings)} suspicious rings from {G.number_of_nodes()} accounts",
+        total_rings=len(suspicious_rings),
+        suspicious_rings=suspicious_rings,
+        graph_stats=graph_stats
+    )
+
+
 @app.post("/detect-rings", response_model=RingDetectionResponse)
 async def detect_suspicious_rings(file: UploadFile = File(...)) -> RingDetectionResponse:
     """
@@ -1328,60 +2584,182 @@ async def detect_suspicious_rings(file: UploadFile = File(...)) -> RingDetection
     
     This endpoint analyzes the transaction network to identify potential money muling rings.
     """
-    # First validate the CSV using existing upload functionality
-    csv_response = await upload_csv(file)
-    
-    if not csv_response.success:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"CSV validation failed: {csv_response.message}"
-        )
+    # First validate the CSV (or reuse a recent upload of the same file)
+    dataset = await _uploaded_dataset(file)
     
     try:
-        # Build the graph
-        G = build_transaction_graph(csv_response.valid_transactions)
-        
-        # Detect rings from all three detectors
-        outgoing_map, incoming_map = create_transaction_maps(G)
+        return await _run_analysis(_ring_detection_response, dataset)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ring detection error: {str(e)}")
+
+
+class _AnalysisDataset:
+    """
+    Validated transactions (a bundled CSV or a recent upload) with the
+    graph, maps and rings derived from them on first use. Shared read-only
+    between requests.
+    """
+
+    def __init__(self, transactions: List[Transaction], error_count: int = 0):
+        self.transactions = transactions
+        self.error_count = error_count
+
+    @classmethod
+    def from_file(cls, path: str) -> "_AnalysisDataset":
+        """Parse and validate a transactions CSV on disk."""
+        csv_data = _read_transactions_file(path)
+
+        # Validate required columns
+        missing_columns = REQUIRED_COLUMNS.difference(csv_data.columns)
+        if missing_columns:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Missing required columns: {', '.join(missing_columns)}"
+            )
+
+        # Process transactions (invalid rows are skipped)
+        transactions, errors = validate_transaction_frame(csv_data, include_row_data=False)
+        return cls(transactions, len(errors))
+
+    @_memoized_property
+    def graph(self) -> nx.MultiDiGraph:
+        return build_transaction_graph(self.transactions)
+
+    @_memoized_property
+    def transaction_maps(self) -> tuple[Dict[str, List[Dict]], Dict[str, List[Dict]]]:
+        return create_transaction_maps(self.graph)
+
+    @_memoized_property
+    def fraud_rings(self) -> List[SuspiciousRing]:
+        """Rings from all three detectors, aggregated with final IDs."""
+        G = self.graph
+        outgoing_map, incoming_map = self.transaction_maps
         cycle_rings = cycle_detector(G)
-        smurfing_rings = smurfing_detector(incoming_map, outgoing_map)
+        smurfing_rings = smurfing_detector(incoming_map, outgoing_map, G)
         layered_rings = detect_layered_networks(G, incoming_map, outgoing_map)
-        
-        # Aggregate: score, sort, and assign final IDs
-        suspicious_rings = aggregate_fraud_rings(cycle_rings, smurfing_rings, layered_rings)
-        
-        # Calculate graph statistics
-        graph_stats = {
-            "total_nodes": G.number_of_nodes(),
-            "total_edges": G.number_of_edges(),
-            "total_amount": sum(data['amount'] for _, _, data in G.edges(data=True)),
-            "rings_by_size": {
-                "3_member_rings": len([r for r in suspicious_rings if len(r.members) == 3]),
-                "4_member_rings": len([r for r in suspicious_rings if len(r.members) == 4]),
-                "5_member_rings": len([r for r in suspicious_rings if len(r.members) == 5])
-            },
-            "high_risk_rings": len([r for r in suspicious_rings if (r.risk_score or 0) > 0.7]),
-            "total_ring_amount": sum(r.total_amount or 0 for r in suspicious_rings),
-            "cycle_rings": len([r for r in suspicious_rings if r.pattern == "cycle"]),
-            "smurfing_fan_in": len([r for r in suspicious_rings if r.pattern == "smurfing_fan_in"]),
-            "smurfing_fan_out": len([r for r in suspicious_rings if r.pattern == "smurfing_fan_out"]),
-            "layered_networks": len([r for r in suspicious_rings if r.pattern == "layered"])
+        return aggregate_fraud_rings(cycle_rings, smurfing_rings, layered_rings)
+
+    @_memoized_property
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-account transaction metrics, shared by scoring and ML features."""
+        return compute_transaction_metrics(self.graph)
+
+    @_memoized_property
+    def graph_stats(self) -> Dict[str, Any]:
+        """Summary statistics reported by ``/analyze-existing-data``."""
+        G = self.graph
+        outgoing_map, incoming_map = self.transaction_maps
+        # One pass over the edges feeds every amount statistic
+        amounts = edge_amounts(G)
+        total_amount = sum(amounts)
+
+        return {
+            "nodes": list(G.nodes())[:50],  # Limit nodes in response for performance
+            "unique_senders": len(outgoing_map),
+            "unique_receivers": len(incoming_map),
+            "total_transactions": len(self.transactions),
+            "validation_errors": self.error_count,
+            "total_amount": total_amount,
+            "average_amount": total_amount / len(amounts) if amounts else 0,
+            "min_amount": min(amounts, default=0),
+            "max_amount": max(amounts, default=0),
+            "density": nx.density(G),
+            "is_connected": is_weakly_connected(G),
+            "top_senders": _top_accounts_by_amount(outgoing_map),
+            "top_receivers": _top_accounts_by_amount(incoming_map),
         }
-        
-        return RingDetectionResponse(
-            success=True,
-            message=f"Detected {len(suspicious_rings)} suspicious rings from {G.number_of_nodes()} accounts",
-            total_rings=len(suspicious_rings),
-            suspicious_rings=suspicious_rings,
-            graph_stats=graph_stats
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ring detection error: {str(e)}")
+
+
+def _top_accounts_by_amount(txn_map: Dict[str, List[Dict]], n: int = 10) -> List[tuple]:
+    """``(account, transaction_count, total_amount)`` for the n largest totals."""
+    # nlargest keeps only n candidates (ties in map order, as a stable sort would)
+    return heapq.nlargest(
+        n,
+        ((acc, len(txns), sum(tx['amount'] for tx in txns)) for acc, txns in txn_map.items()),
+        key=lambda x: x[2],
+    )
+
+
+# path -> ((mtime_ns, size), dataset); refreshed when the file changes
+_bundled_datasets: Dict[str, tuple] = {}
+_bundled_datasets_lock = threading.Lock()
+
+
+def _bundled_dataset(path: str) -> _AnalysisDataset:
+    """Return the cached dataset for ``path``, re-parsing it if the file changed."""
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    # Held while parsing, so concurrent first requests parse the file once
+    with _bundled_datasets_lock:
+        cached = _bundled_datasets.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key, _AnalysisDataset.from_file(path))
+            _bundled_datasets[path] = cached
+    return cached[1]
+
+
+# Recently analysed uploads by content digest (override the count with
+# UPLOAD_CACHE_SIZE; 0 disables it). The frontend posts one file to several
+# endpoints in turn; they then share a single parse, graph and ring set.
+UPLOAD_CACHE_SIZE = int(os.getenv("UPLOAD_CACHE_SIZE", "2"))
+_upload_datasets: "OrderedDict[str, _AnalysisDataset]" = OrderedDict()
+_upload_datasets_lock = threading.Lock()
+
+
+def _upload_digest(stream) -> str:
+    """Digest of an uploaded file's content; leaves the stream rewound."""
+    digest = hashlib.blake2b(digest_size=16)
+    stream.seek(0)
+    for block in iter(lambda: stream.read(1 << 20), b''):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+async def _uploaded_dataset(file: UploadFile) -> _AnalysisDataset:
+    """
+    Validate an uploaded CSV into a dataset, or return the cached one for
+    identical content. Raises 400 when the upload does not validate cleanly.
+    """
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+
+    digest = None
+    if UPLOAD_CACHE_SIZE > 0:
+        digest = await run_in_threadpool(_upload_digest, file.file)
+        with _upload_datasets_lock:
+            dataset = _upload_datasets.get(digest)
+            if dataset is not None:
+                _upload_datasets.move_to_end(digest)
+                return dataset
+
+    csv_response = await upload_csv(file)
+    if not csv_response.success:
+        raise HTTPException(status_code=400, detail=f"CSV validation failed: {csv_response.message}")
+    dataset = _AnalysisDataset(csv_response.valid_transactions)
+
+    if digest is not None:
+        with _upload_datasets_lock:
+            _upload_datasets[digest] = dataset
+            while len(_upload_datasets) > UPLOAD_CACHE_SIZE:
+                _upload_datasets.popitem(last=False)
+    return dataset
+
+
+async def _run_analysis(respond, dataset: _AnalysisDataset, *args):
+    """
+    Call ``respond(dataset.transactions, *args, dataset=dataset)`` off the
+    event loop. The dataset's cached graph and rings live in this process,
+    so with an analysis process pool the worker gets the transactions only
+    and rebuilds them.
+    """
+    if _analysis_pool is not None:
+        return await _run_cpu_bound(respond, dataset.transactions, *args)
+    return await run_in_threadpool(respond, dataset.transactions, *args, dataset=dataset)
 
 
 @app.get("/detect-rings/existing", response_model=RingDetectionResponse)
-async def detect_rings_from_existing_data() -> RingDetectionResponse:
+def detect_rings_from_existing_data() -> RingDetectionResponse:
     """
     Detect suspicious rings from existing transactions.csv file.
     """
@@ -1392,64 +2770,31 @@ async def detect_rings_from_existing_data() -> RingDetectionResponse:
         if not os.path.exists(csv_file_path):
             raise HTTPException(status_code=404, detail="transactions.csv file not found")
         
-        # Load and validate CSV data
-        csv_data = pd.read_csv(csv_file_path)
-        
-        # Validate required columns
-        required_columns = {'transaction_id', 'sender_id', 'receiver_id', 'amount', 'timestamp'}
-        missing_columns = required_columns - set(csv_data.columns)
-        
-        if missing_columns:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Missing required columns: {', '.join(missing_columns)}"
-            )
-        
-        # Process transactions
-        valid_transactions = []
-        
-        for idx, row in csv_data.iterrows():
-            try:
-                transaction_data = {
-                    'transaction_id': str(row['transaction_id']).strip(),
-                    'sender_id': str(row['sender_id']).strip(),
-                    'receiver_id': str(row['receiver_id']).strip(),
-                    'amount': row['amount'],
-                    'timestamp': row['timestamp']
-                }
-                
-                transaction = Transaction(**transaction_data)
-                valid_transactions.append(transaction)
-                
-            except:
-                continue
-        
-        # Build graph and detect rings from all detectors
-        G = build_transaction_graph(valid_transactions)
-        outgoing_map, incoming_map = create_transaction_maps(G)
-        cycle_rings = cycle_detector(G)
-        smurfing_rings = smurfing_detector(incoming_map, outgoing_map)
-        layered_rings = detect_layered_networks(G, incoming_map, outgoing_map)
-        
-        # Aggregate: score, sort, and assign final IDs
-        suspicious_rings = aggregate_fraud_rings(cycle_rings, smurfing_rings, layered_rings)
+        # Parsed graph and aggregated rings, cached until the file changes
+        dataset = _bundled_dataset(csv_file_path)
+        G = dataset.graph
+        suspicious_rings = dataset.fraud_rings
         
         # Calculate graph statistics
+        total_amount = sum(edge_amounts(G))
+        ring_sizes = Counter(len(r.members) for r in suspicious_rings)
+        ring_patterns = Counter(r.pattern for r in suspicious_rings)
+
         graph_stats = {
             "total_nodes": G.number_of_nodes(),
             "total_edges": G.number_of_edges(),
-            "total_amount": sum(data['amount'] for _, _, data in G.edges(data=True)),
+            "total_amount": total_amount,
             "rings_by_size": {
-                "3_member_rings": len([r for r in suspicious_rings if len(r.members) == 3]),
-                "4_member_rings": len([r for r in suspicious_rings if len(r.members) == 4]),
-                "5_member_rings": len([r for r in suspicious_rings if len(r.members) == 5])
+                "3_member_rings": ring_sizes[3],
+                "4_member_rings": ring_sizes[4],
+                "5_member_rings": ring_sizes[5]
             },
-            "high_risk_rings": len([r for r in suspicious_rings if (r.risk_score or 0) > 0.7]),
+            "high_risk_rings": sum(1 for r in suspicious_rings if (r.risk_score or 0) > 0.7),
             "total_ring_amount": sum(r.total_amount or 0 for r in suspicious_rings),
-            "cycle_rings": len([r for r in suspicious_rings if r.pattern == "cycle"]),
-            "smurfing_fan_in": len([r for r in suspicious_rings if r.pattern == "smurfing_fan_in"]),
-            "smurfing_fan_out": len([r for r in suspicious_rings if r.pattern == "smurfing_fan_out"]),
-            "layered_networks": len([r for r in suspicious_rings if r.pattern == "layered"]),
+            "cycle_rings": ring_patterns["cycle"],
+            "smurfing_fan_in": ring_patterns["smurfing_fan_in"],
+            "smurfing_fan_out": ring_patterns["smurfing_fan_out"],
+            "layered_networks": ring_patterns["layered"],
             "average_ring_risk": sum(r.risk_score or 0 for r in suspicious_rings) / len(suspicious_rings) if suspicious_rings else 0
         }
         
@@ -1465,7 +2810,7 @@ async def detect_rings_from_existing_data() -> RingDetectionResponse:
         raise HTTPException(status_code=500, detail=f"Ring detection error: {str(e)}")
 
 @app.get("/analyze-existing-data", response_model=GraphAnalysisResponse)
-async def analyze_existing_data() -> GraphAnalysisResponse:
+def analyze_existing_data() -> GraphAnalysisResponse:
     """
     Analyze the existing transactions.csv file and build graph analysis.
     
@@ -1478,80 +2823,18 @@ async def analyze_existing_data() -> GraphAnalysisResponse:
         if not os.path.exists(csv_file_path):
             raise HTTPException(status_code=404, detail="transactions.csv file not found")
         
-        # Load and validate CSV data
-        csv_data = pd.read_csv(csv_file_path)
-        
-        # Validate required columns
-        required_columns = {'transaction_id', 'sender_id', 'receiver_id', 'amount', 'timestamp'}
-        missing_columns = required_columns - set(csv_data.columns)
-        
-        if missing_columns:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Missing required columns: {', '.join(missing_columns)}"
-            )
-        
-        # Process transactions
-        valid_transactions = []
-        errors = []
-        
-        for idx, row in csv_data.iterrows():
-            try:
-                transaction_data = {
-                    'transaction_id': str(row['transaction_id']).strip(),
-                    'sender_id': str(row['sender_id']).strip(),
-                    'receiver_id': str(row['receiver_id']).strip(),
-                    'amount': row['amount'],
-                    'timestamp': row['timestamp']
-                }
-                
-                transaction = Transaction(**transaction_data)
-                valid_transactions.append(transaction)
-                
-            except Exception as e:
-                errors.append({
-                    'row': idx + 1,
-                    'error': str(e),
-                    'data': row.to_dict()
-                })
-        
-        # Build the graph
-        G = build_transaction_graph(valid_transactions)
-        
-        # Create transaction maps
-        outgoing_map, incoming_map = create_transaction_maps(G)
-        
-        # Calculate advanced graph statistics
-        graph_stats = {
-            "nodes": list(G.nodes())[:50],  # Limit nodes in response for performance
-            "unique_senders": len(outgoing_map),
-            "unique_receivers": len(incoming_map),
-            "total_transactions": len(valid_transactions),
-            "validation_errors": len(errors),
-            "total_amount": sum(data['amount'] for _, _, data in G.edges(data=True)),
-            "average_amount": sum(data['amount'] for _, _, data in G.edges(data=True)) / G.number_of_edges() if G.number_of_edges() > 0 else 0,
-            "min_amount": min((data['amount'] for _, _, data in G.edges(data=True)), default=0),
-            "max_amount": max((data['amount'] for _, _, data in G.edges(data=True)), default=0),
-            "density": nx.density(G),
-            "is_connected": nx.is_weakly_connected(G) if G.number_of_nodes() > 0 else False,
-            "top_senders": sorted(
-                [(acc, len(txns), sum(tx['amount'] for tx in txns)) 
-                 for acc, txns in outgoing_map.items()],
-                key=lambda x: x[2], reverse=True
-            )[:10],
-            "top_receivers": sorted(
-                [(acc, len(txns), sum(tx['amount'] for tx in txns)) 
-                 for acc, txns in incoming_map.items()],
-                key=lambda x: x[2], reverse=True
-            )[:10]
-        }
+        # Parsed transactions, graph, maps and statistics, cached until the file changes
+        dataset = _bundled_dataset(csv_file_path)
+        valid_transactions = dataset.transactions
+        G = dataset.graph
+        outgoing_map, incoming_map = dataset.transaction_maps
         
         return GraphAnalysisResponse(
             success=True,
-            message=f"Successfully analyzed {len(valid_transactions)} transactions from existing data ({len(errors)} validation errors)",
+            message=f"Successfully analyzed {len(valid_transactions)} transactions from existing data ({dataset.error_count} validation errors)",
             nodes_count=G.number_of_nodes(),
             edges_count=G.number_of_edges(),
-            graph_stats=graph_stats,
+            graph_stats=dataset.graph_stats,
             outgoing_map=outgoing_map,
             incoming_map=incoming_map
         )
@@ -1559,6 +2842,32 @@ async def analyze_existing_data() -> GraphAnalysisResponse:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
 
+def _graph_data_response(
+    transactions: List[Transaction],
+    dataset: Optional["_AnalysisDataset"] = None,
+) -> Dict[str, Any]:
+    """Build the Cytoscape.js graph payload for ``/graph-data``."""
+    # Build the graph
+    G = dataset.graph if dataset is not None else build_transaction_graph(transactions)
+
+    # Convert to Cytoscape.js format
+    graph_json = graph_to_json(G)
+
+    total_amount = sum(edge_amounts(G))
+
+    return {
+        "success": True,
+        "message": f"Graph data generated for {G.number_of_nodes()} nodes and {G.number_of_edges()} edges",
+        "graph": graph_json,
+        "stats": {
+            "nodes_count": G.number_of_nodes(),
+            "edges_count": G.number_of_edges(),
+            "total_amount": total_amount,
+            "unique_accounts": G.number_of_nodes()
+        }
+    }
+
+
 @app.post("/graph-data")
 async def get_graph_data(file: UploadFile = File(...)) -> Dict[str, Any]:
     """
@@ -1566,40 +2875,17 @@ async def get_graph_data(file: UploadFile = File(...)) -> Dict[str, Any]:
     
     Returns nodes and edges in the format required by Cytoscape.js
     """
-    # First validate the CSV using existing upload functionality
-    csv_response = await upload_csv(file)
-    
-    if not csv_response.success:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"CSV validation failed: {csv_response.message}"
-        )
+    # First validate the CSV (or reuse a recent upload of the same file)
+    dataset = await _uploaded_dataset(file)
     
     try:
-        # Build the graph
-        G = build_transaction_graph(csv_response.valid_transactions)
-        
-        # Convert to Cytoscape.js format
-        graph_json = graph_to_json(G)
-        
-        return {
-            "success": True,
-            "message": f"Graph data generated for {G.number_of_nodes()} nodes and {G.number_of_edges()} edges",
-            "graph": graph_json,
-            "stats": {
-                "nodes_count": G.number_of_nodes(),
-                "edges_count": G.number_of_edges(),
-                "total_amount": sum(data['amount'] for _, _, data in G.edges(data=True)),
-                "unique_accounts": G.number_of_nodes()
-            }
-        }
-        
+        return await _run_analysis(_graph_data_response, dataset)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Graph generation error: {str(e)}")
 
 
 @app.get("/graph-data/existing")
-async def get_existing_graph_data() -> Dict[str, Any]:
+def get_existing_graph_data() -> Dict[str, Any]:
     """
     Generate graph data from existing transactions.csv for visualization.
     """
@@ -1610,30 +2896,12 @@ async def get_existing_graph_data() -> Dict[str, Any]:
         if not os.path.exists(csv_file_path):
             raise HTTPException(status_code=404, detail="transactions.csv file not found")
         
-        # Use existing analysis function to process the data
-        analysis_response = await analyze_existing_data()
-        
-        # Load CSV again to build graph (we could optimize this)
-        csv_data = pd.read_csv(csv_file_path)
-        valid_transactions = []
-        
-        for idx, row in csv_data.iterrows():
-            try:
-                transaction = Transaction(
-                    transaction_id=str(row['transaction_id']).strip(),
-                    sender_id=str(row['sender_id']).strip(),
-                    receiver_id=str(row['receiver_id']).strip(),
-                    amount=row['amount'],
-                    timestamp=row['timestamp']
-                )
-                valid_transactions.append(transaction)
-            except:
-                continue
-        
-        # Build graph and convert to JSON
-        G = build_transaction_graph(valid_transactions)
+        # Build graph (cached until the file changes) and convert to JSON
+        G = _bundled_dataset(csv_file_path).graph
         graph_json = graph_to_json(G)
         
+        total_amount = sum(edge_amounts(G))
+
         return {
             "success": True,
             "message": f"Graph data generated from existing CSV with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges",
@@ -1641,7 +2909,7 @@ async def get_existing_graph_data() -> Dict[str, Any]:
             "stats": {
                 "nodes_count": G.number_of_nodes(),
                 "edges_count": G.number_of_edges(),
-                "total_amount": sum(data['amount'] for _, _, data in G.edges(data=True)),
+                "total_amount": total_amount,
                 "unique_accounts": G.number_of_nodes()
             }
         }
@@ -1649,82 +2917,78 @@ async def get_existing_graph_data() -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Graph generation error: {str(e)}")
 
+def _suspicion_score_response(
+    transactions: List[Transaction],
+    top_k: Optional[int] = None,
+    dataset: Optional["_AnalysisDataset"] = None,
+) -> SuspicionScoreResponse:
+    """Detect rings and score accounts for ``/suspicion-scores``."""
+    if dataset is not None:
+        G = dataset.graph
+        accounts, merchant_map = compute_suspicion_scores(
+            G, dataset.fraud_rings, dataset.metrics, top_k=top_k
+        )
+    else:
+        G = build_transaction_graph(transactions)
+        outgoing_map, incoming_map = create_transaction_maps(G)
+
+        cycle_rings = cycle_detector(G)
+        smurfing_rings = smurfing_detector(incoming_map, outgoing_map, G)
+        layered_rings = detect_layered_networks(G, incoming_map, outgoing_map)
+        fraud_rings = aggregate_fraud_rings(cycle_rings, smurfing_rings, layered_rings)
+
+        accounts, merchant_map = compute_suspicion_scores(G, fraud_rings, top_k=top_k)
+
+    return SuspicionScoreResponse(
+        success=True,
+        message=f"Scored {len(accounts)} suspicious accounts from {G.number_of_nodes()} total accounts",
+        total_accounts=len(accounts),
+        suspicious_accounts=accounts,
+        merchant_accounts=merchant_map,
+    )
+
+
 @app.post("/suspicion-scores", response_model=SuspicionScoreResponse)
-async def get_suspicion_scores(file: UploadFile = File(...)) -> SuspicionScoreResponse:
+async def get_suspicion_scores(
+    file: UploadFile = File(...),
+    top_k: Optional[int] = None,
+) -> SuspicionScoreResponse:
     """
     Upload CSV and compute per-account suspicion scores.
 
     This endpoint runs the full pipeline: graph construction → ring detection
-    → suspicion scoring.
+    → suspicion scoring. ``top_k`` returns only the highest-scored accounts.
     """
-    csv_response = await upload_csv(file)
-    if not csv_response.success:
-        raise HTTPException(status_code=400, detail=f"CSV validation failed: {csv_response.message}")
+    if top_k is not None and top_k < 0:
+        raise HTTPException(status_code=400, detail="top_k must be non-negative")
+    dataset = await _uploaded_dataset(file)
 
     try:
-        G = build_transaction_graph(csv_response.valid_transactions)
-        outgoing_map, incoming_map = create_transaction_maps(G)
-
-        cycle_rings = cycle_detector(G)
-        smurfing_rings = smurfing_detector(incoming_map, outgoing_map)
-        layered_rings = detect_layered_networks(G, incoming_map, outgoing_map)
-        fraud_rings = aggregate_fraud_rings(cycle_rings, smurfing_rings, layered_rings)
-
-        accounts, merchant_map = compute_suspicion_scores(G, fraud_rings)
-
-        return SuspicionScoreResponse(
-            success=True,
-            message=f"Scored {len(accounts)} suspicious accounts from {G.number_of_nodes()} total accounts",
-            total_accounts=len(accounts),
-            suspicious_accounts=accounts,
-            merchant_accounts=merchant_map,
-        )
+        return await _run_analysis(_suspicion_score_response, dataset, top_k)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scoring error: {str(e)}")
 
 
 @app.get("/suspicion-scores/existing", response_model=SuspicionScoreResponse)
-async def get_suspicion_scores_existing() -> SuspicionScoreResponse:
+def get_suspicion_scores_existing(top_k: Optional[int] = None) -> SuspicionScoreResponse:
     """
     Compute per-account suspicion scores from existing transactions.csv.
+    ``top_k`` returns only the highest-scored accounts.
     """
+    if top_k is not None and top_k < 0:
+        raise HTTPException(status_code=400, detail="top_k must be non-negative")
     try:
         import os
         csv_file_path = os.path.join(os.path.dirname(__file__), "transactions.csv")
         if not os.path.exists(csv_file_path):
             raise HTTPException(status_code=404, detail="transactions.csv file not found")
 
-        csv_data = pd.read_csv(csv_file_path)
-
-        required_columns = {'transaction_id', 'sender_id', 'receiver_id', 'amount', 'timestamp'}
-        missing_columns = required_columns - set(csv_data.columns)
-        if missing_columns:
-            raise HTTPException(status_code=400, detail=f"Missing required columns: {', '.join(missing_columns)}")
-
-        valid_transactions: List[Transaction] = []
-        for _, row in csv_data.iterrows():
-            try:
-                valid_transactions.append(Transaction(
-                    transaction_id=str(row['transaction_id']).strip(),
-                    sender_id=str(row['sender_id']).strip(),
-                    receiver_id=str(row['receiver_id']).strip(),
-                    amount=row['amount'],
-                    timestamp=row['timestamp'],
-                ))
-            except Exception:
-                continue
-
-        G = build_transaction_graph(valid_transactions)
-        outgoing_map, incoming_map = create_transaction_maps(G)
-
-        cycle_rings = cycle_detector(G)
-        smurfing_rings = smurfing_detector(incoming_map, outgoing_map)
-        layered_rings = detect_layered_networks(G, incoming_map, outgoing_map)
-        fraud_rings = aggregate_fraud_rings(cycle_rings, smurfing_rings, layered_rings)
-
-        fraud_rings = aggregate_fraud_rings(cycle_rings, smurfing_rings, layered_rings)
+        dataset = _bundled_dataset(csv_file_path)
+        G = dataset.graph
 
-        accounts, merchant_map = compute_suspicion_scores(G, fraud_rings)
+        accounts, merchant_map = compute_suspicion_scores(
+            G, dataset.fraud_rings, dataset.metrics, top_k=top_k
+        )
 
         return SuspicionScoreResponse(
             success=True,
@@ -1741,53 +3005,49 @@ async def get_suspicion_scores_existing() -> SuspicionScoreResponse:
 # Full Analysis & Report Endpoints
 # ---------------------------------------------------------------------------
 
-def _load_existing_transactions() -> List["Transaction"]:
-    """Load and validate transactions from the existing CSV file."""
+def _existing_dataset() -> _AnalysisDataset:
+    """The bundled demo dataset used by ``/analyze`` when no file is uploaded."""
     csv_file_path = os.path.join(os.path.dirname(__file__), "transactions_with_demo_fraud.csv")
     if not os.path.exists(csv_file_path):
         raise HTTPException(status_code=404, detail="transactions.csv file not found")
 
-    csv_data = pd.read_csv(csv_file_path)
-    required_columns = {"transaction_id", "sender_id", "receiver_id", "amount", "timestamp"}
-    missing = required_columns - set(csv_data.columns)
-    if missing:
-        raise HTTPException(status_code=400, detail=f"Missing required columns: {', '.join(missing)}")
-
-    valid: List[Transaction] = []
-    for _, row in csv_data.iterrows():
-        try:
-            valid.append(Transaction(
-                transaction_id=str(row["transaction_id"]).strip(),
-                sender_id=str(row["sender_id"]).strip(),
-                receiver_id=str(row["receiver_id"]).strip(),
-                amount=row["amount"],
-                timestamp=row["timestamp"],
-            ))
-        except Exception:
-            continue
-    return valid
+    return _bundled_dataset(csv_file_path)
 
 
-def _run_pipeline(transactions: List["Transaction"]) -> Dict[str, Any]:
+def _run_pipeline(
+    transactions: List["Transaction"],
+    dataset: Optional[_AnalysisDataset] = None,
+) -> Dict[str, Any]:
     """
     Execute the full detection pipeline and build the JSON report.
 
+    With a cached ``dataset`` (whose transactions these are), its graph,
+    rings and metrics are reused instead of being rebuilt.
+
     Returns the report dict (also saved to output/latest_report.json).
     """
     t_start = time.perf_counter()
 
-    # 1. Build graph
-    G = build_transaction_graph(transactions)
-    outgoing_map, incoming_map = create_transaction_maps(G)
+    if dataset is not None:
+        G = dataset.graph
+        fraud_rings = dataset.fraud_rings
+        metrics = dataset.metrics
+    else:
+        # 1. Build graph
+        G = build_transaction_graph(transactions)
+        outgoing_map, incoming_map = create_transaction_maps(G)
+
+        # 2. Detect rings
+        cycle_rings = cycle_detector(G)
+        smurfing_rings = smurfing_detector(incoming_map, outgoing_map, G)
+        layered_rings_list = detect_layered_networks(G, incoming_map, outgoing_map)
+        fraud_rings = aggregate_fraud_rings(cycle_rings, smurfing_rings, layered_rings_list)
 
-    # 2. Detect rings
-    cycle_rings = cycle_detector(G)
-    smurfing_rings = smurfing_detector(incoming_map, outgoing_map)
-    layered_rings_list = detect_layered_networks(G, incoming_map, outgoing_map)
-    fraud_rings = aggregate_fraud_rings(cycle_rings, smurfing_rings, layered_rings_list)
+        # Metrics are shared by the rule-based scores and the ML features
+        metrics = compute_transaction_metrics(G)
 
     # 3. Compute rule-based suspicion scores
-    suspicious_accounts, _merchant_map = compute_suspicion_scores(G, fraud_rings)
+    suspicious_accounts, _merchant_map = compute_suspicion_scores(G, fraud_rings, metrics)
 
     # 4. Prepare data for the JSON formatter
     # Convert SuspiciousRing objects to plain dicts
@@ -1812,24 +3072,23 @@ def _run_pipeline(transactions: List["Transaction"]) -> Dict[str, Any]:
     final_scores_detail: Dict[str, Dict[str, float]] = {}
 
     # Only accounts that belong to at least one ring are "suspicious"
-    ring_member_ids: set[str] = set()
-    for r in fraud_rings:
-        ring_member_ids.update(r.members)
+    ring_member_ids = frozenset().union(*(r.members for r in fraud_rings))
 
     if ml_is_available():
-        account_features = _extract_pipeline_features(G, fraud_rings)
+        account_features = _extract_pipeline_features(G, fraud_rings, metrics)
         ml_probabilities = predict_fraud_probabilities(account_features)
         final_scores_detail = compute_final_scores(rule_scores, ml_probabilities)
         # Use blended final_score, but ONLY for ring members
+        # Key-view intersections visit ring members only, not every account;
+        # the report sorts accounts itself, so dict order does not matter
         account_scores: Dict[str, int] = {
-            acct: int(round(detail["final_score"]))
-            for acct, detail in final_scores_detail.items()
-            if acct in ring_member_ids
+            acct: int(round(final_scores_detail[acct]["final_score"]))
+            for acct in final_scores_detail.keys() & ring_member_ids
         }
         # Also limit ml_probabilities to ring members for report detail
         ml_probabilities = {
-            acct: prob for acct, prob in ml_probabilities.items()
-            if acct in ring_member_ids
+            acct: ml_probabilities[acct]
+            for acct in ml_probabilities.keys() & ring_member_ids
         }
     else:
         # Fallback: use rule scores only (already ring-members-only)
@@ -1869,17 +3128,18 @@ async def analyze(file: Optional[UploadFile] = File(None)) -> Dict[str, Any]:
     """
     try:
         if file is not None:
-            csv_response = await upload_csv(file)
-            if not csv_response.success:
-                raise HTTPException(status_code=400, detail=f"CSV validation failed: {csv_response.message}")
-            transactions = csv_response.valid_transactions
+            dataset = await _uploaded_dataset(file)
         else:
-            transactions = _load_existing_transactions()
+            dataset = await run_in_threadpool(_existing_dataset)
 
-        if not transactions:
+        if not dataset.transactions:
             raise HTTPException(status_code=400, detail="No valid transactions to analyze")
 
-        return _run_pipeline(transactions)
+        if file is None:
+            # The bundled dataset's cached graph and rings live in this
+            # process: stay in the thread pool rather than a worker process
+            return await run_in_threadpool(_run_pipeline, dataset.transactions, dataset)
+        return await _run_analysis(_run_pipeline, dataset)
 
     except HTTPException:
         raise
@@ -1887,13 +3147,25 @@ async def analyze(file: Optional[UploadFile] = File(None)) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
 @app.get("/download-report")
-async def download_report() -> FileResponse:
+async def download_report(request: Request) -> Response:
     """
     Download the latest fraud detection report as a JSON file.
 
     Returns ``output/latest_report.json`` with the download filename
-    ``fraud_detection_report.json``.
+    ``fraud_detection_report.json``. The response carries an ETag derived
+    from the file's mtime and size; a matching ``If-None-Match`` gets a
+    bodiless 304 instead of the report.
     """
     from services.json_formatter import get_report_path
 
@@ -1903,10 +3175,18 @@ async def download_report() -> FileResponse:
             status_code=404,
             detail="No report available. Run POST /analyze first.",
         )
+    stat = os.stat(report_path)
+    etag = f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    # no-cache: clients may store the report but must revalidate each time
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
     return FileResponse(
         path=report_path,
         media_type="application/json",
         filename="fraud_detection_report.json",
+        headers=headers,
+        stat_result=stat,
     )
 
 
@@ -1925,3 +3205,18 @@ def get_sample_csv() -> dict:
             }
         }
     }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Production-style entry point: libuv event loop + C HTTP parser, with
+    # WEB_CONCURRENCY worker processes so one heavy upload doesn't block others
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
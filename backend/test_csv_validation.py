@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Tests for vectorised CSV validation (validate_transaction_frame).
+
+Covers:
+  - Valid rows built on the fast path
+  - Invalid amounts / timestamps reported with 1-based row numbers
+  - Infinite and missing amounts rejected on every path
+  - Packed transactions carry exactly the instance state model_construct sets
+  - Non-ISO timestamps still accepted via the per-row fallback
+  - Row order preserved across fast and fallback rows, also in full-size chunks
+  - Chunks validated in a worker pool match inline validation
+  - Upload error list omits row data by default and is capped
+  - Small uploads validated with the csv module match the pandas path
+  - Valid transactions can be paged with offset/limit
+  - The columnar upload returns the same rows and counts as /upload-csv
+"""
+
+import asyncio
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+from fastapi import UploadFile
+from pydantic import BaseModel
+
+import main
+from main import Transaction, validate_transaction_frame
+
+
+_HEADER = "transaction_id,sender_id,receiver_id,amount,timestamp\n"
+
+
+def _frame(rows: str) -> pd.DataFrame:
+    return pd.read_csv(io.StringIO(_HEADER + rows))
+
+
+def test_valid_rows():
+    """Clean rows are all accepted with normalised fields."""
+    df = _frame(
+        "T1, A ,B,10.5,2024-01-01 10:00:00\n"
+        "T2,B,C,20,2024-01-01T11:30:00\n"
+    )
+    valid, errors = validate_transaction_frame(df)
+    assert errors == []
+    assert [t.transaction_id for t in valid] == ["T1", "T2"]
+    assert valid[0].sender_id == "A"
+    assert valid[0].amount == 10.5
+    assert valid[1].timestamp == datetime(2024, 1, 1, 11, 30)
+    print("✅ test_valid_rows passed")
+
+
+def test_invalid_rows_reported():
+    """Bad amounts and timestamps produce errors with 1-based row numbers."""
+    df = _frame(
+        "T1,A,B,10,2024-01-01 10:00\n"
+        "T2,A,B,-5,2024-01-01 10:00\n"
+        "T3,A,B,abc,2024-01-01 10:00\n"
+        "T4,A,B,5,notadate\n"
+    )
+    valid, errors = validate_transaction_frame(df)
+    assert [t.transaction_id for t in valid] == ["T1"]
+    assert [e["row"] for e in errors] == [2, 3, 4]
+    assert "Invalid amount format" in errors[0]["error"]
+    assert "Invalid timestamp format" in errors[2]["error"]
+    assert errors[2]["data"]["transaction_id"] == "T4"
+    print("✅ test_invalid_rows_reported passed")
+
+
+def test_non_finite_amounts_rejected():
+    """inf / NaN amounts are row errors, not transactions with a null amount."""
+    rows = (
+        "T1,A,B,10,2024-01-01 10:00\n"
+        "T2,A,B,inf,2024-01-01 10:00\n"
+        "T3,A,B,,2024-01-01 10:00\n"
+        "T4,A,B,NaN,2024-01-01 10:00\n"
+        "T5,A,B,1e400,2024-01-01 10:00\n"
+    )
+    valid, errors = validate_transaction_frame(_frame(rows))
+    assert [t.transaction_id for t in valid] == ["T1"]
+    assert [e["row"] for e in errors] == [2, 3, 4, 5]
+    assert all("Invalid amount format" in e["error"] for e in errors)
+
+    data = (_HEADER + rows).encode()
+    assert main._validate_small_csv(data) is None
+    file = UploadFile(io.BytesIO(data), filename="inf.csv", size=len(data))
+    response = asyncio.run(main.upload_csv(file))
+    assert not response.success
+    assert [e["row"] for e in response.errors] == [2, 3, 4, 5]
+    assert [t.amount for t in response.valid_transactions] == [10.0]
+    print("✅ test_non_finite_amounts_rejected passed")
+
+
+def test_fallback_preserves_order():
+    """Rows needing the per-row parser keep their position in the output."""
+    df = _frame(
+        "T1,A,B,10,2024-01-01 10:00\n"
+        "T2, B ,C,10,Jan 2 2024 10:00\n"
+        "T3,C,A,10,2024-01-03 10:00\n"
+    )
+    valid, errors = validate_transaction_frame(df)
+    assert errors == []
+    assert [t.transaction_id for t in valid] == ["T1", "T2", "T3"]
+    assert valid[1].timestamp == datetime(2024, 1, 2, 10, 0)
+    assert valid[1].sender_id == "B"
+    print("✅ test_fallback_preserves_order passed")
+
+
+def test_fallback_merge_scales():
+    """One fallback row in a full chunk is merged back in linear time."""
+    rows = main._CSV_CHUNK_ROWS
+    body = "".join(f"T{i},A{i % 97},B{i % 89},{i + 1},2024-01-01 10:00\n" for i in range(rows))
+    fallback = rows // 2
+    body = body.replace(f"T{fallback},A{fallback % 97},B{fallback % 89},{fallback + 1},2024-01-01 10:00\n",
+                        f"T{fallback},A{fallback % 97},B{fallback % 89},{fallback + 1},Jan 2 2024 10:00\n")
+    df = _frame(body)
+
+    start = time.perf_counter()
+    valid, errors = validate_transaction_frame(df)
+    elapsed = time.perf_counter() - start
+
+    assert errors == []
+    assert [t.transaction_id for t in valid] == [f"T{i}" for i in range(rows)]
+    assert valid[fallback].timestamp == datetime(2024, 1, 2, 10, 0)
+    assert elapsed < 10, f"validating {rows} rows took {elapsed:.1f}s"
+    print("✅ test_fallback_merge_scales passed")
+
+
+def test_matches_model_validation():
+    """Fast-path output equals validating each row with the Pydantic model."""
+    df = pd.read_csv("transactions.csv")
+    valid, errors = validate_transaction_frame(df)
+    expected = [
+        Transaction(
+            transaction_id=str(r.transaction_id).strip(),
+            sender_id=str(r.sender_id).strip(),
+            receiver_id=str(r.receiver_id).strip(),
+            amount=r.amount,
+            timestamp=r.timestamp,
+        )
+        for r in df.itertuples(index=False)
+    ]
+    assert errors == []
+    assert valid == expected
+    assert all(t.model_fields_set == e.model_fields_set for t, e in zip(valid, expected))
+    print("✅ test_matches_model_validation passed")
+
+
+def test_pack_transactions_matches_model_construct():
+    """
+    _pack_transactions writes pydantic's instance slots directly; fail
+    loudly if their layout no longer matches model_construct.
+    """
+    fields = dict(transaction_id="T1", sender_id="A", receiver_id="B",
+                  amount=10.0, timestamp=datetime(2024, 1, 1, 10, 0))
+    packed, = main._pack_transactions(*([value] for value in fields.values()))
+    built = Transaction.model_construct(**fields)
+    for slot in BaseModel.__slots__:
+        assert getattr(packed, slot) == getattr(built, slot), f"pydantic changed {slot}"
+    assert type(packed.model_fields_set) is type(built.model_fields_set)
+    assert packed.model_dump() == built.model_dump()
+    assert packed.model_copy(update={"amount": 5.0}).amount == 5.0
+    packed.amount = 20.0  # fields set is per instance and mutable
+    assert packed.amount == 20.0 and packed.model_fields_set == built.model_fields_set
+    print("✅ test_pack_transactions_matches_model_construct passed")
+
+
+def test_pool_matches_inline():
+    """Chunked validation gives the same response with and without workers."""
+    with open("transactions.csv", "rb") as f:
+        data = f.read()
+
+    def upload():
+        file = UploadFile(io.BytesIO(data), filename="transactions.csv")
+        return asyncio.run(main.upload_csv(file)).model_dump()
+
+    original_chunk_rows = main._CSV_CHUNK_ROWS
+    main._CSV_CHUNK_ROWS = 50
+    try:
+        inline = upload()
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            main._validation_pool = pool
+            pooled = upload()
+    finally:
+        main._validation_pool = None
+        main._CSV_CHUNK_ROWS = original_chunk_rows
+
+    assert pooled == inline
+    assert pooled["total_rows"] == len(pooled["valid_transactions"]) > 50
+    print("✅ test_pool_matches_inline passed")
+
+
+def test_upload_error_reporting():
+    """Row data is opt-in and the error list stops at MAX_REPORTED_ERRORS."""
+    data = (_HEADER + "T1,A,B,-1,2024-01-01 10:00\n" * 5).encode()
+
+    def upload(**kwargs):
+        file = UploadFile(io.BytesIO(data), filename="bad.csv")
+        return asyncio.run(main.upload_csv(file, **kwargs))
+
+    original_cap = main.MAX_REPORTED_ERRORS
+    main.MAX_REPORTED_ERRORS = 3
+    try:
+        response = upload()
+        detailed = upload(include_row_data=True)
+    finally:
+        main.MAX_REPORTED_ERRORS = original_cap
+
+    assert not response.success
+    assert response.message.endswith("with 5 errors")
+    assert [e["row"] for e in response.errors] == [1, 2, 3]
+    assert response.errors_truncated
+    assert "data" not in response.errors[0]
+    assert detailed.errors[0]["data"]["transaction_id"] == "T1"
+    print("✅ test_upload_error_reporting passed")
+
+
+def test_small_upload_matches_pandas():
+    """The stdlib csv path gives the same response as the pandas path."""
+    bodies = [
+        _HEADER + "T1, A ,B,10.5,2024-01-01T10:00:00Z\r\n\r\nT2,B,C,20,2024-01-01 11:30\r\n",
+        "amount,timestamp,receiver_id,sender_id,transaction_id,note\n5,2024-01-01,B,A,T1,x\n",
+        _HEADER + "NA,A,B,5,2024-01-01\n",           # NA id: pandas path
+        _HEADER + "T1,A,B,5,20240101\n",             # numeric timestamp column
+        _HEADER + "T1,A,B,-5,2024-01-01\nT2,A,B,5,Jan 2 2024\n",
+    ]
+
+    def upload(data, size):
+        file = UploadFile(io.BytesIO(data), filename="small.csv", size=size)
+        return asyncio.run(main.upload_csv(file, include_row_data=True)).model_dump()
+
+    for body in bodies:
+        data = body.encode()
+        assert upload(data, len(data)) == upload(data, None), body
+    assert main._validate_small_csv(bodies[0].encode()) is not None
+    assert main._validate_small_csv(bodies[2].encode()) is None
+    print("✅ test_small_upload_matches_pandas passed")
+
+
+def test_upload_paging():
+    """offset/limit slice valid_transactions; valid_count stays the full count."""
+    with open("transactions.csv", "rb") as f:
+        data = f.read()
+
+    def upload(**kwargs):
+        file = UploadFile(io.BytesIO(data), filename="transactions.csv")
+        return asyncio.run(main.upload_csv(file, **kwargs))
+
+    full = upload()
+    paged = upload(offset=5, limit=10)
+    summary = upload(limit=0)
+
+    assert full.valid_count == len(full.valid_transactions)
+    assert paged.valid_transactions == full.valid_transactions[5:15]
+    assert paged.valid_count == summary.valid_count == full.valid_count
+    assert summary.valid_transactions == []
+    print("✅ test_upload_paging passed")
+
+
+def test_columnar_upload_matches_rows():
+    """/upload-csv/columnar lists the /upload-csv rows column by column."""
+    data = (_HEADER + (
+        "T1,A,B,10,2024-01-01 10:00\n"
+        "T2, B ,C,10,Jan 2 2024 10:00\n"   # per-row fallback
+        "T3,C,A,-1,2024-01-03 10:00\n"     # error
+        "T4,C,A,7.5,2024-01-03T10:00:00Z\n"
+    )).encode()
+
+    def upload(endpoint):
+        file = UploadFile(io.BytesIO(data), filename="rows.csv")
+        return asyncio.run(endpoint(file)).model_dump()
+
+    rows = upload(main.upload_csv)
+    columns = upload(main.upload_csv_columnar)
+    transactions = rows["valid_transactions"]
+    assert columns["valid_count"] == rows["valid_count"] == 3
+    assert columns["transaction_ids"] == [t["transaction_id"] for t in transactions]
+    assert columns["sender_ids"] == [t["sender_id"] for t in transactions]
+    assert columns["receiver_ids"] == [t["receiver_id"] for t in transactions]
+    assert columns["amounts"] == [t["amount"] for t in transactions]
+    assert columns["timestamps"] == [t["timestamp"] for t in transactions]
+    assert columns["errors"] == rows["errors"]
+    assert (columns["success"], columns["message"]) == (rows["success"], rows["message"])
+    print("✅ test_columnar_upload_matches_rows passed")
+
+
+if __name__ == "__main__":
+    test_valid_rows()
+    test_invalid_rows_reported()
+    test_non_finite_amounts_rejected()
+    test_fallback_preserves_order()
+    test_fallback_merge_scales()
+    test_matches_model_validation()
+    test_pack_transactions_matches_model_construct()
+    test_pool_matches_inline()
+    test_upload_error_reporting()
+    test_small_upload_matches_pandas()
+    test_upload_paging()
+    test_columnar_upload_matches_rows()
+    print("\n🎉 All CSV validation tests passed!")
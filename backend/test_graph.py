@@ -3,10 +3,21 @@
 Test script to demonstrate NetworkX graph building functionality.
 """
 
+import asyncio
+import io
+import threading
+
 import pandas as pd
 import networkx as nx
 from dateutil import parser as date_parser
-from main import Transaction, build_transaction_graph, create_transaction_maps
+from fastapi import UploadFile
+
+import main
+from main import (
+    Transaction, build_transaction_graph, create_transaction_maps,
+    convert_to_simple_graph, edge_table, account_txns,
+    detect_cycles, compute_transaction_metrics, graph_to_json,
+)
 
 
 def load_sample_transactions(csv_file: str = "transactions.csv", limit: int = 10):
@@ -45,6 +56,16 @@ def demonstrate_graph_analysis():
     
     # Create transaction maps
     outgoing_map, incoming_map = create_transaction_maps(G)
+
+    # The columnar views hold the same per-account rows as the maps
+    outgoing, incoming = account_txns(G)
+    for view, txn_map, peer_key in ((outgoing, outgoing_map, 'receiver_id'),
+                                    (incoming, incoming_map, 'sender_id')):
+        assert view.accounts.tolist() == list(txn_map)
+        for k, account in enumerate(view.accounts.tolist()):
+            lo, hi = view.indptr[k], view.indptr[k + 1]
+            assert view.peer[lo:hi].tolist() == [tx[peer_key] for tx in txn_map[account]]
+    print("✅ Columnar views match the transaction maps")
     
     print(f"\n📤 Outgoing transactions map (accounts that send money):")
     for account, txns in list(outgoing_map.items())[:3]:
@@ -71,5 +92,138 @@ def demonstrate_graph_analysis():
             print(f"  └─ {tx['timestamp']}: ${tx['amount']:,.2f} → {tx['receiver_id']}")
 
 
+def test_edge_table_matches_graph():
+    """The cached edge table lists the same edges, in the same order, as G.edges()."""
+    G = build_transaction_graph(load_sample_transactions(limit=200))
+    table = edge_table(G)
+    order = table.edge_order
+
+    expected = [
+        (u, v, d['tx_id'], d['amount'], d['timestamp'].isoformat())
+        for u, v, d in G.edges(data=True)
+    ]
+    actual = list(zip(
+        table.nodes[table.src[order]].tolist(),
+        table.nodes[table.dst[order]].tolist(),
+        table.tx_ids[order].tolist(),
+        table.amount[order].tolist(),
+        table.ts_iso[order].tolist(),
+    ))
+    assert actual == expected
+    assert list(table.nodes) == list(G.nodes())
+
+    # Same table rebuilt by walking the graph
+    G.__networkx_cache__.clear()
+    assert edge_table(G).tx_ids.tolist() == [d['tx_id'] for _, _, d in G.edges(data=True)]
+
+    simple = convert_to_simple_graph(G)
+    assert list(simple.edges()) == list(dict.fromkeys(G.edges()))
+    assert list(simple.nodes()) == list(dict.fromkeys(n for e in G.edges() for n in e))
+    print("✅ test_edge_table_matches_graph passed")
+
+
+def test_graph_changes_after_first_use():
+    """Edges added after a first analysis call are seen by later calls."""
+    G = build_transaction_graph([
+        Transaction(transaction_id="T1", sender_id="A", receiver_id="B", amount=100.0,
+                    timestamp=date_parser.parse("2024-01-01T10:00:00")),
+    ])
+    assert detect_cycles(G) == []
+    outgoing_map, _ = create_transaction_maps(G)
+    assert list(outgoing_map) == ["A"]
+    assert compute_transaction_metrics(G)["B"]["total_transactions"] == 1
+
+    G.add_edge("B", "A", transaction_id="T2", tx_id="T2", amount=50.0,
+               timestamp=date_parser.parse("2024-01-01T11:00:00"))
+    assert detect_cycles(G) == [["A", "B"]]
+    outgoing_map, incoming_map = create_transaction_maps(G)
+    assert [tx["tx_id"] for tx in outgoing_map["B"]] == ["T2"]
+    assert [tx["tx_id"] for tx in incoming_map["A"]] == ["T2"]
+    assert compute_transaction_metrics(G)["B"]["total_transactions"] == 2
+    assert len(graph_to_json(G)["edges"]) == 2
+
+    # Graphs assembled by hand get their table derived, and dropped, the same way
+    H = nx.MultiDiGraph()
+    H.add_edge("A", "B", tx_id="T1", amount=100.0,
+               timestamp=date_parser.parse("2024-01-01T10:00:00"))
+    assert compute_transaction_metrics(H)["A"]["total_transactions"] == 1
+    for tx_id, (u, v) in (("T2", ("B", "C")), ("T3", ("C", "A"))):
+        H.add_edge(u, v, tx_id=tx_id, amount=50.0,
+                   timestamp=date_parser.parse("2024-01-01T11:00:00"))
+        assert len(edge_table(H)) == H.number_of_edges()
+    assert compute_transaction_metrics(H)["A"]["total_transactions"] == 2
+    assert detect_cycles(H) == [["A", "B", "C"]]
+    assert list(create_transaction_maps(H)[0]) == ["A", "B", "C"]
+    print("✅ test_graph_changes_after_first_use passed")
+
+
+def test_far_future_timestamps():
+    """Dates outside the nanosecond range (1677-2262) analyse like any other."""
+    data = (
+        b"transaction_id,sender_id,receiver_id,amount,timestamp\n"
+        b"T1,A,B,100.0,2024-01-01 10:00:00\n"
+        b"T2,B,C,90.0,3024-01-01 11:00:00\n"
+        b"T3,C,A,80.0,1500-06-01 09:30:00\n"
+    )
+
+    def upload(endpoint):
+        return asyncio.run(endpoint(UploadFile(io.BytesIO(data), filename="future.csv")))
+
+    assert upload(main.build_graph).edges_count == 3
+    edges = upload(main.get_graph_data)["graph"]["edges"]
+    assert [e["timestamp"] for e in edges] == [
+        "2024-01-01T10:00:00", "3024-01-01T11:00:00", "1500-06-01T09:30:00",
+    ]
+    assert upload(main.detect_suspicious_rings).total_rings == 1
+    print("✅ test_far_future_timestamps passed")
+
+
+def test_datasets_analyse_concurrently():
+    """A slow build on one dataset doesn't hold up another; each builds once."""
+    def dataset(sender):
+        return main._AnalysisDataset([
+            Transaction(transaction_id="T1", sender_id=sender, receiver_id="B", amount=100.0,
+                        timestamp=date_parser.parse("2024-01-01T10:00:00")),
+        ])
+
+    slow, fast = dataset("A"), dataset("C")
+    started, release = threading.Event(), threading.Event()
+    build = main.build_transaction_graph
+    builds = []
+
+    def slow_build(transactions):
+        builds.append(transactions)
+        if transactions is slow.transactions:
+            started.set()
+            release.wait(10)
+        return build(transactions)
+
+    main.build_transaction_graph = slow_build
+    try:
+        graphs = []
+        readers = [threading.Thread(target=lambda: graphs.append(slow.graph)) for _ in range(2)]
+        for reader in readers:
+            reader.start()
+        assert started.wait(10)
+        other = threading.Thread(target=lambda: fast.graph)
+        other.start()
+        other.join(5)
+        assert not other.is_alive(), "second dataset waited on the first"
+        release.set()
+        for reader in readers:
+            reader.join(10)
+    finally:
+        release.set()
+        main.build_transaction_graph = build
+
+    assert len(graphs) == 2 and graphs[0] is graphs[1]
+    assert len(builds) == 2
+    print("✅ test_datasets_analyse_concurrently passed")
+
+
 if __name__ == "__main__":
-    demonstrate_graph_analysis()
\ No newline at end of file
+    demonstrate_graph_analysis()
+    test_edge_table_matches_graph()
+    test_graph_changes_after_first_use()
+    test_far_future_timestamps()
+    test_datasets_analyse_concurrently()
\ No newline at end of file
@@ -3,10 +3,17 @@
 Test script for suspicious ring detection functionality.
 """
 
+import random
 import pandas as pd
 import json
+import networkx as nx
 from dateutil import parser as date_parser
-from main import Transaction, build_transaction_graph, cycle_detector
+from main import (
+    Transaction, build_transaction_graph, cycle_detector,
+    SuspiciousRing, aggregate_fraud_rings, assign_risk_scores,
+    sort_rings_by_risk, assign_ring_ids, combine_all_rings,
+    detect_cycles, convert_to_simple_graph,
+)
 
 
 def test_ring_detection():
@@ -158,7 +165,57 @@ def create_test_ring_data():
     return rings
 
 
+def test_aggregate_matches_stepwise():
+    """Fused aggregation equals scoring, sorting and renumbering step by step."""
+    cycles = [SuspiciousRing(ring_id="C1", members=["A", "B", "C"], pattern="cycle",
+                             total_amount=30.0, transaction_count=3)]
+    smurfing = [SuspiciousRing(ring_id=f"S{i}", members=[f"M{j}" for j in range(i + 11)],
+                               pattern="smurfing_fan_in") for i in range(3)]
+    layered = [SuspiciousRing(ring_id="L1", members=["W", "X", "Y", "Z"], pattern="layered")]
+
+    fused = aggregate_fraud_rings(cycles, smurfing, layered)
+    stepwise = assign_ring_ids(sort_rings_by_risk(assign_risk_scores(
+        combine_all_rings(cycles, smurfing, layered))))
+
+    assert [r.model_dump() for r in fused] == [r.model_dump() for r in stepwise]
+    assert [r.ring_id for r in fused] == [f"RING_{i:03}" for i in range(1, 6)]
+    assert cycles[0].ring_id == "C1" and cycles[0].risk_score is None  # inputs untouched
+    print("✅ test_aggregate_matches_stepwise passed")
+
+
+def test_detect_cycles_matches_networkx():
+    """Bounded cycle enumeration finds the same cycles as nx.simple_cycles."""
+    def rotated(cycle):
+        i = cycle.index(min(cycle))
+        return tuple(cycle[i:] + cycle[:i])
+
+    rng = random.Random(7)
+    for trial in range(50):
+        transactions = [
+            Transaction(
+                transaction_id=f"T{trial}_{i}",
+                sender_id=f"ACC_{rng.randrange(10)}",
+                receiver_id=f"ACC_{rng.randrange(10)}",
+                amount=100.0,
+                timestamp=date_parser.parse("2023-01-01T10:00:00"),
+            )
+            for i in range(rng.randrange(30))
+        ]
+        G = build_transaction_graph(transactions)
+        for max_length in (2, 3, 5):
+            cycles = detect_cycles(G, max_length)
+            expected = nx.simple_cycles(convert_to_simple_graph(G), length_bound=max_length)
+            # Each cycle once, starting from its smallest member, in sorted order
+            assert [tuple(c) for c in cycles] == [rotated(c) for c in cycles]
+            assert sorted(map(tuple, cycles)) == sorted(map(rotated, expected))
+            assert [c[0] for c in cycles] == sorted(c[0] for c in cycles)
+    print("✅ test_detect_cycles_matches_networkx passed")
+
+
 if __name__ == "__main__":
+    test_aggregate_matches_stepwise()
+    test_detect_cycles_matches_networkx()
+
     # Test with sample data
     rings = test_ring_detection()
     
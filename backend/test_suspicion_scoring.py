@@ -208,6 +208,17 @@ def test_deterministic_ordering():
     print("✅ test_deterministic_ordering passed")
 
 
+def test_top_k():
+    """top_k keeps the first k accounts of the full ordering."""
+    scores = {"C": 50, "A": 50, "B": 80, "D": 10}
+    account_to_rings = {"A": ["R1"], "B": ["R1"], "C": ["R1"], "D": ["R1"]}
+    full = build_final_account_list(scores, account_to_rings)
+    top = build_final_account_list(scores, account_to_rings, top_k=2)
+    assert [a.account_id for a in top] == [a.account_id for a in full][:2] == ["B", "A"]
+    assert build_final_account_list(scores, account_to_rings, top_k=0) == []
+    print("✅ test_top_k passed")
+
+
 def test_spec_example_cycle_with_velocity():
     """
     Spec test case:
@@ -300,6 +311,7 @@ if __name__ == "__main__":
     test_clamping_lower()
     test_clamping_upper()
     test_deterministic_ordering()
+    test_top_k()
     test_spec_example_cycle_with_velocity()
     test_spec_example_merchant_zeroed()
     test_empty_rings()
@@ -178,10 +178,10 @@ def _compute_ring_sizes(df: pd.DataFrame, merged: pd.DataFrame) -> None:
         if ra != rb:
             parent[ra] = rb
 
-    for _, row in df.iterrows():
-        s, r = row["sender_id"], row["receiver_id"]
-        if s in fraud_ids and r in fraud_ids:
-            union(s, r)
+    # Only fraud-to-fraud transactions matter; select them column-wise
+    both_fraud = df["sender_id"].isin(fraud_ids) & df["receiver_id"].isin(fraud_ids)
+    for s, r in zip(df.loc[both_fraud, "sender_id"], df.loc[both_fraud, "receiver_id"]):
+        union(s, r)
 
     # Count component sizes
     components: Dict[str, set] = defaultdict(set)
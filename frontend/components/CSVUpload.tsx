@@ -14,7 +14,7 @@ interface Transaction {
 interface ValidationError {
   row: number;
   error: string;
-  data: Record<string, any>;
+  data?: Record<string, any>;
 }
 
 interface UploadResponse {
@@ -27,7 +27,7 @@ interface Transaction {
 interface ValidationError {
   row: number;
   error: string;
-  data: Record<string, unknown>;
+  data?: Record<string, unknown>;
 }
 
 interface UploadResponse {